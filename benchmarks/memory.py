@@ -0,0 +1,131 @@
+from benchmarks import synthetic
+from conversion import process
+from main import configure_and_get_config
+from typing import Any, Callable, Dict, List
+import argparse
+import gc
+import json
+import tracemalloc
+
+
+def get_slot_values(value: Any) -> Dict[str, Any]:
+    # Private slots are stored under their mangled names, e.g., "__value" of
+    # BoundedText under "_BoundedText__value".
+    values = {}
+    for cls in type(value).__mro__:
+        for name in getattr(cls, '__slots__', ()):
+            stored = f'_{cls.__name__.lstrip("_")}{name}' if name.startswith(
+                '__') and not name.endswith('__') else name
+            if hasattr(value, stored):
+                values[name.lstrip('_')] = getattr(value, stored)
+    return values
+
+
+def get_unslotted_type(cls: type, types: Dict[type, type]) -> type:
+    # A plain class per slotted class, so instances share their attribute
+    # names like instances of the classes did before they were slotted.
+    if cls not in types:
+        types[cls] = type(f'Unslotted{cls.__name__}', (), {})
+    return types[cls]
+
+
+def to_unslotted(value: Any, converted: Dict[int, Any],
+                 types: Dict[type, type]) -> Any:
+    # The same object graph built from instances with a __dict__ and from
+    # lists instead of tuples, as converted resumes were before they were
+    # slotted. Objects shared between resumes, e.g., the clock, stay shared.
+    # Converted objects are kept alive along with their result, so their ids
+    # are not reused while converting.
+    if id(value) in converted:
+        return converted[id(value)][1]
+
+    if isinstance(value, (tuple, list)):
+        result: Any = [to_unslotted(v, converted, types) for v in value]
+    elif type(value).__module__.startswith('conversion.') and hasattr(
+            type(value), '__slots__'):
+        result = get_unslotted_type(type(value), types)()
+        for (n, v) in get_slot_values(value).items():
+            setattr(result, n, to_unslotted(v, converted, types))
+    else:
+        result = value
+    converted[id(value)] = (value, result)
+    return result
+
+
+def get_retained_bytes(build: Callable[[], List[Any]]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    built = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(built) > 0
+    return after - before
+
+
+def run(records: int, sizes: list[int], seed: int) -> None:
+    plan = process.ConversionPlan(configure_and_get_config())
+
+    for size in sizes:
+        shape = synthetic.ResumeShape().scaled(size)
+        resumes = synthetic.generate_resumes(seed, records, shape)
+
+        # Convert once before measuring so one-time allocations, e.g., compiled
+        # regular expressions, interned strings and unslotted classes, are not
+        # counted.
+        types: Dict[type, type] = {}
+        to_unslotted(plan.get_resume(resumes[0]), {}, types)
+
+        def build_unslotted() -> List[Any]:
+            converted: Dict[int, Any] = {}
+            unslotted = [
+                to_unslotted(plan.get_resume(r), converted, types)
+                for r in resumes
+            ]
+            converted.clear()
+            return unslotted
+
+        baseline = get_retained_bytes(build_unslotted)
+        retained = get_retained_bytes(
+            lambda: [plan.get_resume(r) for r in resumes])
+        print(
+            json.dumps({
+                'benchmark':
+                'converted_resume_memory',
+                'size':
+                size,
+                'records':
+                records,
+                'unslotted_retained_bytes':
+                baseline,
+                'retained_bytes':
+                retained,
+                'unslotted_bytes_per_resume':
+                round(baseline / records, 1),
+                'bytes_per_resume':
+                round(retained / records, 1),
+                'ratio':
+                round(baseline / retained, 2)
+            }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='''
+        Measures the memory retained by converted resumes, i.e., the domain
+        objects ConversionPlan.get_resume builds, when a whole batch is held at
+        once, against the same resumes built from instances with a __dict__
+        and from lists, as they were before they were slotted.
+        ''')
+    parser.add_argument('--records', type=int, default=200)
+    parser.add_argument('--sizes',
+                        type=lambda v: [int(s) for s in v.split(',')],
+                        default=[1, 4])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    run(args.records, args.sizes, args.seed)
+
+
+if __name__ == '__main__':
+    main()
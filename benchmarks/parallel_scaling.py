@@ -0,0 +1,75 @@
+from benchmarks import synthetic
+from datetime import datetime, timezone
+from main import PipelineOptions, TemplateOptions, render_batch
+import argparse
+import json
+import os
+import tempfile
+import time
+
+
+def get_jobs_to_measure(max_jobs: int) -> list[int]:
+    jobs = 1
+    measured = []
+    while jobs < max_jobs:
+        measured.append(jobs)
+        jobs *= 2
+    measured.append(max_jobs)
+    return measured
+
+
+def run(template_location: str, template_name: str, records: int,
+        max_jobs: int, seed: int) -> None:
+    resumes = synthetic.generate_resumes(seed, records,
+                                         synthetic.ResumeShape())
+
+    options = PipelineOptions(TemplateOptions(template_location),
+                              (template_name, ), datetime.now(timezone.utc))
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_names = []
+        for (i, r) in enumerate(resumes):
+            input_file_name = os.path.join(temp_dir, f'{i}.json')
+            with open(input_file_name, 'w') as file:
+                json.dump(r, file)
+            file_names.append((input_file_name, (f'{input_file_name}.md', )))
+
+        baseline = None
+        for jobs in get_jobs_to_measure(max_jobs):
+            start = time.perf_counter()
+            failures = sum(1 for r in render_batch(options, file_names, jobs)
+                           if r.error is not None)
+            seconds = time.perf_counter() - start
+
+            baseline = seconds if baseline is None else baseline
+            speedup = baseline / seconds
+            print(json.dumps({
+                'benchmark': 'parallel_scaling',
+                'template': template_name,
+                'records': records,
+                'jobs': jobs,
+                'seconds': round(seconds, 6),
+                'records_per_second': round(records / seconds, 2),
+                'speedup': round(speedup, 3),
+                'efficiency': round(speedup / jobs, 3),
+                'failures': failures
+            }),
+                  flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Measures how batch rendering scales with --jobs.')
+    parser.add_argument('--template-location', default='templates')
+    parser.add_argument('--template-name', default='pdf')
+    parser.add_argument('--records', type=int, default=2000)
+    parser.add_argument('--max-jobs', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    run(args.template_location, args.template_name, args.records,
+        args.max_jobs, args.seed)
+
+
+if __name__ == '__main__':
+    main()
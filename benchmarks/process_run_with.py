@@ -0,0 +1,324 @@
+from benchmarks import synthetic
+from conversion import bounded_text, education, email, location, number, phone_number, process, profile, project, ranked_entity, resume, technical_knowledge, time, work_experience
+from main import configure_and_get_config
+from time import perf_counter
+from typing import Any, Callable, Dict, FrozenSet, List
+import argparse
+import json
+
+
+def legacy_run_with(config: process.Config, data: Dict[str,
+                                                       Any]) -> Dict[str, Any]:
+    # Process.run_with as it was before the conversion plan was built once
+    # per Process: every call defines its helpers and sort lambdas anew, and
+    # collects lists into frozensets that are sorted back into lists. Only
+    # kept as the baseline of this benchmark.
+    limits = config.limits
+    parsers = config.parsers
+    converters = config.converters
+    formatters = config.formatters
+    clock = config.clock
+
+    def iter(list_data, fn) -> FrozenSet[Any]:
+        return frozenset([fn(d) for d in list_data])
+
+    def get_short_text(text) -> bounded_text.BoundedText:
+        return bounded_text.BoundedText(limits.short_bounded_text, text)
+
+    def get_long_text(text) -> bounded_text.BoundedText:
+        return bounded_text.BoundedText(limits.long_bounded_text, text)
+
+    def get_ranked_text(
+            ranked_text,
+            text_fn) -> ranked_entity.RankedEntity[bounded_text.BoundedText]:
+        return ranked_entity.RankedEntity(number.Number(ranked_text['rank']),
+                                          text_fn(ranked_text['text']))
+
+    def get_short_ranked_text(
+            ranked_text
+    ) -> ranked_entity.RankedEntity[bounded_text.BoundedText]:
+        return get_ranked_text(ranked_text, get_short_text)
+
+    def get_long_ranked_text(
+            ranked_text
+    ) -> ranked_entity.RankedEntity[bounded_text.BoundedText]:
+        return get_ranked_text(ranked_text, get_long_text)
+
+    def get_location(location_data) -> location.Location:
+        return location.FromStringsToCityAndStateLocation(
+            location_data.get('city'), location_data.get('state')).create()
+
+    def get_work_location(location_data) -> location.Location:
+        loc = get_location(location_data)
+        if location_data.get('remote') == True:
+            return location.RemoteLocation(loc)
+        return loc
+
+    def get_degree(degree_data) -> education.Degree:
+        program = get_short_text(degree_data.get('program'))
+        major = get_short_text(degree_data.get('major'))
+
+        degree_data_minor = degree_data.get('minor')
+        minor = None if degree_data_minor is None else get_short_text(
+            degree_data_minor)
+        degree_data_emphasis = degree_data.get('emphasis')
+        emphasis = None if degree_data_emphasis is None else get_short_text(
+            degree_data_emphasis)
+
+        return education.Degree(program, major, minor, emphasis)
+
+    def get_involvement_level(
+            involvement_leve_data) -> education.InvolvementLevel:
+        title = get_short_text(involvement_leve_data.get('title'))
+        start_date = time.FromStartDate(
+            parsers.date, involvement_leve_data.get('startDate')).create()
+        end_date = time.FromEndDate(parsers.date,
+                                    involvement_leve_data.get('endDate'),
+                                    clock).create()
+        return education.InvolvementLevel(title, start_date, end_date)
+
+    def get_involvement(involvement_data) -> education.Involvement:
+        organization = get_short_text(involvement_data.get('organization'))
+        levels = iter(involvement_data.get('levels'), get_involvement_level)
+        return education.Involvement(organization, levels)
+
+    def get_profile(profile_data) -> profile.Profile:
+        applicant_name = get_short_text(profile_data.get('name'))
+        applicant_phone_number = phone_number.FromDigitsStringToPhoneNumber(
+            parsers.phone_number, converters.digits_to_phone_number,
+            profile_data.get('phoneNumber')).create()
+        applicant_email = email.FromEmailString(
+            parsers.email, profile_data.get('email')).create()
+        return profile.Profile(applicant_name, applicant_phone_number,
+                               applicant_email)
+
+    def get_work_experience(
+            work_experience_data) -> work_experience.WorkExperience:
+        company_name = get_short_text(work_experience_data.get('companyName'))
+        work_location = get_work_location(work_experience_data.get('location'))
+        title = get_short_text(work_experience_data.get('title'))
+        start_date = time.FromStartDate(
+            parsers.date, work_experience_data.get('startDate')).create()
+        end_date = time.FromEndDate(parsers.date,
+                                    work_experience_data.get('endDate'),
+                                    clock).create()
+        contributions = iter(work_experience_data.get('contributions'),
+                             get_long_ranked_text)
+        return work_experience.WorkExperience(company_name, work_location,
+                                              title, start_date, end_date,
+                                              contributions)
+
+    def get_education(education_data) -> education.Education:
+        degree = get_degree(education_data.get('degree'))
+        institution = get_short_text(education_data.get('institution'))
+        institution_location = get_location(education_data.get('location'))
+        start_date = time.FromStartDate(
+            parsers.date, education_data.get('startDate')).create()
+        end_date = time.FromEndDate(parsers.date,
+                                    education_data.get('endDate'),
+                                    clock).create()
+        notable_coursework = iter(education_data.get('notableCoursework'),
+                                  get_short_text)
+        involvement = iter(education_data.get('involvement'), get_involvement)
+        gpa = number.Number(education_data.get('gpa'))
+        return education.Education(degree, institution, institution_location,
+                                   start_date, end_date, notable_coursework,
+                                   involvement, gpa)
+
+    def get_technical_knowledge(
+            technical_knowledge_data
+    ) -> technical_knowledge.TechnicalKnowledge:
+        category = get_short_text(technical_knowledge_data.get('category'))
+        proficiencies = iter(technical_knowledge_data.get('proficiencies'),
+                             get_short_ranked_text)
+        return technical_knowledge.TechnicalKnowledge(category, proficiencies)
+
+    def get_ranked_technical_knowledge(
+        ranked_technical_knowledge_data
+    ) -> ranked_entity.RankedEntity[technical_knowledge.TechnicalKnowledge]:
+        return ranked_entity.RankedEntity(
+            number.Number(ranked_technical_knowledge_data['rank']),
+            get_technical_knowledge(ranked_technical_knowledge_data))
+
+    def get_project(project_data) -> project.Project:
+        title = get_short_text(project_data.get('title'))
+        description = get_long_text(project_data.get('description'))
+        return project.Project(title, description)
+
+    def get_ranked_project(
+            ranked_project_data
+    ) -> ranked_entity.RankedEntity[project.Project]:
+        return ranked_entity.RankedEntity(
+            number.Number(ranked_project_data['rank']),
+            get_project(ranked_project_data))
+
+    applicant_resume = resume.Resume(
+        get_profile(data.get('profile')),
+        iter(data.get('workExperience'), get_work_experience),
+        iter(data.get('education'), get_education),
+        iter(data.get('technicalKnowledge'), get_ranked_technical_knowledge),
+        iter(data.get('projects'), get_ranked_project))
+
+    return {
+        'profile': {
+            'name':
+            applicant_resume.applicant_profile.applicant_name.to_string(),
+            'phone_number':
+            applicant_resume.applicant_profile.applicant_phone_number.
+            to_string(formatters.phone_number),
+            'email':
+            applicant_resume.applicant_profile.applicant_email.to_string(
+                formatters.email)
+        },
+        'work_experience': [{
+            'company_name':
+            we.company_name.to_string(),
+            'location':
+            we.work_location.to_string(formatters.location),
+            'title':
+            we.title.to_string(),
+            'start_date':
+            we.start_date.to_string(formatters.date),
+            'end_date':
+            we.end_date.to_string(formatters.date),
+            'contributions': [
+                v.to_string() for v in ranked_entity.RankedEntityCollection(
+                    *[c for c in we.contributions]).to_sorted_values()
+            ]
+        } for we in sorted(applicant_resume.applicant_work_experience,
+                           key=lambda v: v.start_date.value().timestamp(),
+                           reverse=True)],
+        'education': [{
+            'degree': {
+                'program':
+                e.degree.program.to_string(),
+                'major':
+                e.degree.major.to_string(),
+                'minor':
+                None if e.degree.minor is None else e.degree.minor.to_string(),
+                'emphasis':
+                None if e.degree.emphasis is None else
+                e.degree.emphasis.to_string()
+            },
+            'institution':
+            e.institution.to_string(),
+            'location':
+            e.institution_location.to_string(formatters.location),
+            'start_date':
+            e.start_date.to_string(formatters.date),
+            'end_date':
+            e.end_date.to_string(formatters.date),
+            'notable_coursework': [
+                nc.to_string()
+                for nc in sorted(e.notable_coursework,
+                                 key=lambda v: v.to_string().upper())
+            ],
+            'involvement': [{
+                'organization':
+                i.organization.to_string(),
+                'levels': [{
+                    'title':
+                    l.title.to_string(),
+                    'start_date':
+                    l.start_date.to_string(formatters.date),
+                    'end_date':
+                    l.end_date.to_string(formatters.date)
+                } for l in sorted(
+                    i.levels,
+                    key=lambda v: v.start_date.value().timestamp(),
+                    reverse=True)]
+            } for i in sorted(e.involvement,
+                              key=lambda v: v.organization.to_string().upper())
+                            ],
+            'gpa':
+            e.gpa.to_string(formatters.number)
+        } for e in sorted(applicant_resume.applicant_education,
+                          key=lambda v: v.start_date.value().timestamp(),
+                          reverse=True)],
+        'technical_knowledge': [{
+            'category':
+            v.category.to_string(),
+            'proficiencies': [
+                t.to_string() for t in ranked_entity.RankedEntityCollection(
+                    *[p for p in v.proficiencies]).to_sorted_values()
+            ]
+        } for v in ranked_entity.RankedEntityCollection(
+            *[tk for tk in applicant_resume.applicant_technical_knowledge
+              ]).to_sorted_values()],
+        'projects': [{
+            'title': v.title.to_string(),
+            'description': v.description.to_string()
+        } for v in ranked_entity.RankedEntityCollection(
+            *[p for p in applicant_resume.applicant_projects
+              ]).to_sorted_values()]
+    }
+
+
+def best_seconds(run_withs: List[Callable[[Dict[str, Any]], Any]],
+                 resumes: List[Dict[str, Any]], repeat: int) -> List[float]:
+    # Warm up once so one-time costs, e.g., regex compilation, are excluded.
+    # Each repeat times every variant in turn, so drift in machine load
+    # affects all of them alike.
+    for run_with in run_withs:
+        for r in resumes:
+            run_with(r)
+
+    timings: List[List[float]] = [[] for _ in run_withs]
+    for _ in range(repeat):
+        for (run_with, variant_timings) in zip(run_withs, timings):
+            start = perf_counter()
+            for r in resumes:
+                run_with(r)
+            variant_timings.append(perf_counter() - start)
+    return [min(t) for t in timings]
+
+
+def run(records: int, repeat: int, seed: int) -> None:
+    resumes = synthetic.generate_resumes(seed, records,
+                                         synthetic.ResumeShape())
+    config = configure_and_get_config()
+    proc = process.Process(config)
+
+    def run_with_legacy(data: Dict[str, Any]) -> Dict[str, Any]:
+        return legacy_run_with(config, data)
+
+    (legacy, built_once) = best_seconds([run_with_legacy, proc.run_with],
+                                        resumes, repeat)
+    print(
+        json.dumps({
+            'benchmark':
+            'process_run_with',
+            'records':
+            records,
+            'repeat':
+            repeat,
+            'legacy_best_seconds':
+            round(legacy, 6),
+            'best_seconds':
+            round(built_once, 6),
+            'legacy_microseconds_per_record':
+            round(legacy / records * 1e6, 2),
+            'microseconds_per_record':
+            round(built_once / records * 1e6, 2),
+            'speedup':
+            round(legacy / built_once, 2)
+        }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='''
+        Measures the per-record cost of Process.run_with, which builds its
+        conversion plan once, against the run_with it replaced, which
+        defined its helpers on every call and collected lists into
+        frozensets.
+        ''')
+    parser.add_argument('--records', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    run(args.records, args.repeat, args.seed)
+
+
+if __name__ == '__main__':
+    main()
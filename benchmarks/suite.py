@@ -0,0 +1,205 @@
+from benchmarks import synthetic
+from conversion import email, location, number, process, time as conversion_time
+from dataclasses import asdict, fields
+from datetime import datetime, timezone
+from main import TemplateOptions, configure_and_get_config, get_templates_by_name
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+import argparse
+import contextlib
+import json
+import platform
+import sys
+import time
+
+
+def best_seconds(fn: Callable[[], Any], repeat: int) -> float:
+    # The first call warms caches, e.g., compiled regular expressions, and is
+    # not measured.
+    fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def call_each(fn: Callable[[Any], Any],
+              inputs: List[Any]) -> Tuple[int, Callable[[], None]]:
+
+    def run() -> None:
+        for i in inputs:
+            fn(i)
+
+    return (len(inputs), run)
+
+
+def get_dates(resumes: List[Dict[str, Any]]) -> List[str]:
+    dates = []
+    for r in resumes:
+        for we in r['workExperience']:
+            dates.append(we['startDate'])
+            if we['endDate'] is not None:
+                dates.append(we['endDate'])
+        for e in r['education']:
+            dates.extend([e['startDate'], e['endDate']])
+            for i in e['involvement']:
+                for l in i['levels']:
+                    dates.extend([l['startDate'], l['endDate']])
+    return dates
+
+
+def get_locations(resumes: List[Dict[str, Any]]) -> List[location.Location]:
+    locations = []
+    for r in resumes:
+        for d in [we['location'] for we in r['workExperience']
+                  ] + [e['location'] for e in r['education']]:
+            loc = location.FromStringsToCityAndStateLocation(
+                d['city'], d['state']).create()
+            locations.append(
+                location.RemoteLocation(loc) if d.get('remote') else loc)
+    return locations
+
+
+def get_component_benchmarks(
+    config: process.Config,
+    resumes: List[Dict[str,
+                       Any]]) -> Dict[str, Tuple[int, Callable[[], None]]]:
+    parsers = config.parsers
+    converters = config.converters
+    formatters = config.formatters
+
+    dates = get_dates(resumes)
+    emails = [r['profile']['email'] for r in resumes]
+    phone_numbers = [r['profile']['phoneNumber'] for r in resumes]
+
+    parsed_dates = [
+        conversion_time.ValidDate(parsers.date.parse(d)) for d in dates
+    ]
+    parsed_emails = [
+        email.FromEmailString(parsers.email, e).create() for e in emails
+    ]
+    phone_number_digits = [
+        parsers.phone_number.parse(p) for p in phone_numbers
+    ]
+    converted_phone_numbers = [
+        converters.digits_to_phone_number.convert(d)
+        for d in phone_number_digits
+    ]
+    gpas = [number.Number(e['gpa']) for r in resumes for e in r['education']]
+
+    def name(component: Any, method: str) -> str:
+        component_type = type(component)
+        module_name = component_type.__module__.split('.')[-1]
+        return f'{module_name}.{component_type.__qualname__}.{method}'
+
+    return {
+        name(parsers.date, 'parse'):
+        call_each(parsers.date.parse, dates),
+        name(parsers.email, 'parse'):
+        call_each(parsers.email.parse, emails),
+        name(parsers.phone_number, 'parse'):
+        call_each(parsers.phone_number.parse, phone_numbers),
+        name(converters.digits_to_phone_number, 'convert'):
+        call_each(converters.digits_to_phone_number.convert,
+                  phone_number_digits),
+        name(formatters.date, 'format'):
+        call_each(formatters.date.format, parsed_dates),
+        name(formatters.email, 'format'):
+        call_each(formatters.email.format, parsed_emails),
+        name(formatters.location, 'format'):
+        call_each(formatters.location.format, get_locations(resumes)),
+        name(formatters.number, 'format'):
+        call_each(formatters.number.format, gpas),
+        name(formatters.phone_number, 'format'):
+        call_each(formatters.phone_number.format, converted_phone_numbers)
+    }
+
+
+def run(sizes: List[int], base_shape: synthetic.ResumeShape, records: int,
+        repeat: int, seed: int, template_location: str,
+        template_names: List[str]) -> Iterator[Dict[str, Any]]:
+    config = configure_and_get_config(
+        conversion_time.SnapshotClock(datetime.now(timezone.utc)))
+    proc = process.Process(config)
+    templates = get_templates_by_name(TemplateOptions(template_location),
+                                      template_names)
+
+    for size in sizes:
+        shape = base_shape.scaled(size)
+        resumes = synthetic.generate_resumes(seed, records, shape)
+
+        def result(benchmark: str, calls: int,
+                   seconds: float) -> Dict[str, Any]:
+            return {
+                'suite': 'conversion',
+                'benchmark': benchmark,
+                'size': size,
+                'shape': asdict(shape),
+                'records': records,
+                'calls': calls,
+                'best_seconds': seconds,
+                'microseconds_per_call': seconds / max(calls, 1) * 1e6,
+                'python': platform.python_version()
+            }
+
+        benchmarks = {'process.run_with': call_each(proc.run_with, resumes)}
+
+        template_data = [proc.run_with(r) for r in resumes]
+        for (n, t) in templates.items():
+            benchmarks[f'render.{n}'] = call_each(t.render, template_data)
+
+        benchmarks.update(get_component_benchmarks(config, resumes))
+        for (n, (calls, fn)) in benchmarks.items():
+            yield result(n, calls, best_seconds(fn, repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='''
+        Times Process.run_with, every configured parser, converter and
+        formatter, and full template renders for synthetic resumes of growing
+        size. Results are written as JSON lines.
+        ''')
+    parser.add_argument('--sizes',
+                        type=lambda v: [int(s) for s in v.split(',')],
+                        default=[1, 2, 4, 8],
+                        help='Comma-separated factors to scale the shape by.')
+    parser.add_argument('--records', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--template-location', default='templates')
+    parser.add_argument('--template-names',
+                        type=lambda v: v.split(','),
+                        default=['markdown', 'pdf'])
+    for f in fields(synthetic.ResumeShape):
+        parser.add_argument(f'--{f.name.replace("_", "-")}',
+                            dest=f.name,
+                            type=int,
+                            default=f.default,
+                            help=f'Base number of {f.name} entries.')
+    parser.add_argument(
+        '-o',
+        '--output',
+        dest='output_file_name',
+        help='The file to write results to. Defaults to stdout.')
+    args = parser.parse_args()
+
+    shape_fields = {
+        f.name: getattr(args, f.name)
+        for f in fields(synthetic.ResumeShape)
+    }
+    base_shape = synthetic.ResumeShape(**shape_fields)
+    results = run(args.sizes, base_shape, args.records, args.repeat, args.seed,
+                  args.template_location, args.template_names)
+
+    with contextlib.ExitStack() as stack:
+        output = sys.stdout if args.output_file_name is None else stack.enter_context(
+            open(args.output_file_name, 'w'))
+        for r in results:
+            output.write(json.dumps(r))
+            output.write('\n')
+            output.flush()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+from dataclasses import dataclass, fields, replace
+from typing import Any, Dict, List
+import random
+
+_WORDS = ('design', 'build', 'ship', 'scale', 'measure', 'refactor', 'migrate',
+          'automate', 'document', 'review', 'service', 'pipeline', 'platform',
+          'latency', 'throughput', 'customers', 'release', 'team')
+
+_PLACES = (('Austin', 'TX'), ('Seattle', 'WA'), ('Denver', 'CO'),
+           ('Boston', 'MA'), ('Chicago', 'IL'), ('Portland', 'OR'))
+
+
+@dataclass(frozen=True)
+class ResumeShape:
+    work_experience: int = 4
+    contributions: int = 5
+    education: int = 2
+    notable_coursework: int = 4
+    involvement: int = 2
+    involvement_levels: int = 2
+    technical_knowledge: int = 4
+    proficiencies: int = 6
+    projects: int = 3
+
+    def scaled(self, factor: int) -> 'ResumeShape':
+        return replace(
+            self,
+            **{f.name: getattr(self, f.name) * factor
+               for f in fields(self)})
+
+
+def _sentence(rng: random.Random, word_count: int) -> str:
+    words = [rng.choice(_WORDS) for _ in range(word_count)]
+    return ' '.join(words).capitalize()
+
+
+def _year_month(rng: random.Random, start_year: int, end_year: int) -> str:
+    return f'{rng.randint(start_year, end_year)}-{rng.randint(1, 12):02d}'
+
+
+def _location(rng: random.Random, remote: bool = False) -> Dict[str, Any]:
+    (city, state) = rng.choice(_PLACES)
+    return {'city': city, 'state': state, 'remote': remote}
+
+
+def _ranked_texts(rng: random.Random, count: int,
+                  word_count: int) -> List[Dict[str, Any]]:
+    return [{
+        'rank': r,
+        'text': _sentence(rng, word_count)
+    } for r in rng.sample(range(count), count)]
+
+
+def generate_resume(rng: random.Random, shape: ResumeShape) -> Dict[str, Any]:
+    return {
+        'profile': {
+            'name': _sentence(rng, 2),
+            'phoneNumber':
+            f'+1 ({rng.randint(200, 999)}) {rng.randint(200, 999)}-{rng.randint(0, 9999):04d}',
+            'email': f'{rng.choice(_WORDS)}.{rng.randint(0, 999)}@example.com'
+        },
+        'workExperience': [{
+            'companyName':
+            _sentence(rng, 2),
+            'location':
+            _location(rng,
+                      rng.random() < 0.3),
+            'title':
+            _sentence(rng, 2),
+            'startDate':
+            _year_month(rng, 2000, 2020),
+            'endDate':
+            None if i == 0 else _year_month(rng, 2021, 2024),
+            'contributions':
+            _ranked_texts(rng, shape.contributions, 12)
+        } for i in range(shape.work_experience)],
+        'education': [{
+            'degree': {
+                'program': 'B.S.',
+                'major': _sentence(rng, 2),
+                'minor': _sentence(rng, 1) if rng.random() < 0.5 else None
+            },
+            'institution':
+            _sentence(rng, 3),
+            'location':
+            _location(rng),
+            'startDate':
+            _year_month(rng, 1990, 2010),
+            'endDate':
+            _year_month(rng, 2011, 2015),
+            'notableCoursework':
+            [_sentence(rng, 2) for _ in range(shape.notable_coursework)],
+            'involvement': [{
+                'organization':
+                _sentence(rng, 2),
+                'levels': [{
+                    'title': _sentence(rng, 1),
+                    'startDate': _year_month(rng, 1990, 2010),
+                    'endDate': _year_month(rng, 2011, 2015)
+                } for _ in range(shape.involvement_levels)]
+            } for _ in range(shape.involvement)],
+            'gpa':
+            round(rng.uniform(2.0, 4.0), 2)
+        } for _ in range(shape.education)],
+        'technicalKnowledge': [{
+            'rank':
+            r,
+            'category':
+            _sentence(rng, 1),
+            'proficiencies':
+            _ranked_texts(rng, shape.proficiencies, 1)
+        } for r in range(shape.technical_knowledge)],
+        'projects': [{
+            'rank': r,
+            'title': _sentence(rng, 3),
+            'description': _sentence(rng, 20)
+        } for r in range(shape.projects)]
+    }
+
+
+def generate_resumes(seed: int, count: int,
+                     shape: ResumeShape) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [generate_resume(rng, shape) for _ in range(count)]
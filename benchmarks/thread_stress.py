@@ -0,0 +1,135 @@
+from benchmarks import synthetic
+from concurrent.futures import ThreadPoolExecutor
+from conversion import time as conversion_time
+from datetime import datetime, timezone
+from main import TemplateOptions, configure_and_get_process, get_field_mask, get_section_limits, get_template_projections, get_templates_by_name, render_many
+from typing import Any, Dict, List
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+
+def is_gil_enabled() -> bool:
+    # Only free-threaded builds, i.e., Python 3.13 and later, can run without
+    # the GIL.
+    is_enabled = getattr(sys, '_is_gil_enabled', None)
+    return True if is_enabled is None else is_enabled()
+
+
+def run(records: int, threads: List[int], repeat: int, seed: int,
+        memoization_max_size: int, template_location: str,
+        template_names: List[str]) -> int:
+    resumes = synthetic.generate_resumes(seed, records,
+                                         synthetic.ResumeShape())
+    options = TemplateOptions(template_location)
+    templates = get_templates_by_name(options, template_names)
+    projections = get_template_projections(options, templates.keys()).values()
+    mask = get_field_mask(p.field_mask for p in projections)
+    limits = get_section_limits(p.section_limits for p in projections)
+    clock = conversion_time.SnapshotClock(datetime.now(timezone.utc))
+
+    # Every thread count renders with one process and one set of templates,
+    # shared by all of its threads, and must match a single-threaded render.
+    reference_proc = configure_and_get_process(clock)
+    expected = [
+        render_many(reference_proc, templates, r, mask=mask, limits=limits)
+        for r in resumes
+    ]
+
+    total_mismatches = 0
+    baseline_seconds = None
+    for thread_count in threads:
+        proc = configure_and_get_process(
+            clock, memoization_max_size=memoization_max_size)
+
+        def render_part(indices: List[int]) -> Dict[int, Dict[str, str]]:
+            return {
+                i:
+                render_many(proc,
+                            templates,
+                            resumes[i],
+                            mask=mask,
+                            limits=limits)
+                for i in indices
+            }
+
+        # Each thread gets a shuffled share of the records, so threads hit the
+        # shared caches in different orders.
+        rng = random.Random(seed)
+        indices = list(range(records))
+        rng.shuffle(indices)
+        parts = [indices[t::thread_count] for t in range(thread_count)]
+
+        best = None
+        mismatches = 0
+        with ThreadPoolExecutor(thread_count) as executor:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                rendered: Dict[int, Dict[str, str]] = {}
+                for part in executor.map(render_part, parts):
+                    rendered.update(part)
+                seconds = time.perf_counter() - start
+                best = seconds if best is None else min(best, seconds)
+
+                mismatches += sum(1 for i in range(records)
+                                  if rendered[i] != expected[i])
+
+        assert best is not None
+        baseline_seconds = best if baseline_seconds is None else baseline_seconds
+        result: Dict[str, Any] = {
+            'benchmark': 'threaded_render',
+            'threads': thread_count,
+            'records': records,
+            'memoization_max_size': memoization_max_size,
+            'best_seconds': round(best, 6),
+            'records_per_second': round(records / best, 1),
+            'speedup': round(baseline_seconds / best, 2),
+            'mismatches': mismatches,
+            'gil_enabled': is_gil_enabled(),
+            'python': platform.python_version()
+        }
+        print(json.dumps(result))
+        total_mismatches += mismatches
+
+    return total_mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description='''
+        Renders synthetic resumes from many threads sharing one Process and one
+        set of templates, checks every document against a single-threaded
+        render and reports throughput per thread count. Exits with 1 when any
+        document differs. Scaling past one thread needs a free-threaded
+        (no-GIL) Python build.
+        ''')
+    parser.add_argument('--records', type=int, default=500)
+    parser.add_argument('--threads',
+                        type=lambda v: [int(t) for t in v.split(',')],
+                        default=[1, 2, 4, 8])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--memoize',
+                        dest='memoization_max_size',
+                        type=int,
+                        default=4096,
+                        help='''
+                        The size of the shared memoization caches. 0 turns
+                        memoization off.
+                        ''')
+    parser.add_argument('--template-location', default='templates')
+    parser.add_argument('--template-names',
+                        type=lambda v: v.split(','),
+                        default=['markdown', 'pdf'])
+    args = parser.parse_args()
+
+    mismatches = run(args.records, args.threads, args.repeat, args.seed,
+                     args.memoization_max_size, args.template_location,
+                     args.template_names)
+    sys.exit(1 if mismatches > 0 else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+from concurrent.futures import ThreadPoolExecutor
+from conversion import time as conversion_time
+from typing import List
+import argparse
+import json
+import random
+import time
+
+
+def get_dates(count: int, distinct: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    pool = [
+        f'{rng.randint(1970, 2030)}-{rng.randint(1, 12):02d}'
+        for _ in range(distinct)
+    ]
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def best_seconds(parser: conversion_time.DateParser, dates: List[str],
+                 threads: int, repeat: int) -> float:
+
+    def parse_all(part: List[str]) -> None:
+        for d in part:
+            parser.parse(d)
+
+    parts = [dates[i::threads] for i in range(threads)]
+    timings = []
+    with ThreadPoolExecutor(threads) as executor:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            list(executor.map(parse_all, parts))
+            timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='''
+        Compares YearMonthParser, which goes through datetime.strptime, with
+        FastYearMonthParser, on one thread and on several.
+        ''')
+    parser.add_argument('--dates', type=int, default=100000)
+    parser.add_argument('--distinct',
+                        type=int,
+                        default=720,
+                        help='''
+                        The number of distinct dates. 720 covers every month
+                        of 60 years, more than the fast parser caches.
+                        ''')
+    parser.add_argument('--threads',
+                        type=lambda v: [int(t) for t in v.split(',')],
+                        default=[1, 4])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    dates = get_dates(args.dates, args.distinct, args.seed)
+    parsers = {
+        'YearMonthParser':
+        conversion_time.YearMonthParser(),
+        'FastYearMonthParser':
+        conversion_time.FastYearMonthParser(),
+        'FastYearMonthParser.uncached':
+        conversion_time.FastYearMonthParser(cache_size=0)
+    }
+    for threads in args.threads:
+        for (name, p) in parsers.items():
+            seconds = best_seconds(p, dates, threads, args.repeat)
+            result = {
+                'benchmark': name,
+                'dates': len(dates),
+                'distinct': args.distinct,
+                'threads': threads,
+                'best_seconds': round(seconds, 6),
+                'nanoseconds_per_date': round(seconds / len(dates) * 1e9, 1)
+            }
+            print(json.dumps(result))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+from argparse import ArgumentParser
+
+from main import TemplateOptions, compile_template_bundle
+
+
+def get_arg_parser() -> ArgumentParser:
+    prog = "Resume Generator Template Compiler"
+    description = '''
+    Precompiles every template in a template directory into a bundle of Python
+    modules. Pass the bundle to main.py or server.py with --template-bundle to
+    skip lexing and parsing templates at startup.
+    '''
+    parser = ArgumentParser(prog=prog, description=description)
+
+    template_location_help = '''
+    The directory containing template files.
+    '''
+    parser.add_argument('-t',
+                        '--template',
+                        dest='template_location',
+                        type=str,
+                        required=False,
+                        default='templates',
+                        help=template_location_help)
+
+    bundle_location_help = '''
+    The directory or, when it ends in ".zip", the zip file to write the
+    compiled templates to.
+    '''
+    parser.add_argument('-o',
+                        '--output',
+                        dest='bundle_location',
+                        type=str,
+                        required=True,
+                        help=bundle_location_help)
+
+    return parser
+
+
+def main() -> None:
+    parser = get_arg_parser()
+    args = parser.parse_args()
+
+    compile_template_bundle(TemplateOptions(args.template_location),
+                            args.bundle_location)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,12 +10,14 @@ class BoundedTextLimits:
 
 class BoundedText:
 
+    # Text is trimmed and cut to its limit once, when created. to_string is
+    # called for sort keys as well as for output.
+    __slots__ = ('__value', )
+
     def __init__(self, limits: BoundedTextLimits, value: str):
-        self.__limits = limits
-        self.__value = value
+        trimmed = value.strip()
+        limit = min(limits.char_limit(), len(trimmed))
+        self.__value = trimmed[0:limit]
 
     def to_string(self) -> str:
-        trimmed = self.__value.strip()
-        limit = min(self.__limits.char_limit(), len(trimmed))
-        return trimmed[0:limit]
-
+        return self.__value
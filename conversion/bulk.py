@@ -0,0 +1,50 @@
+from collections.abc import Hashable
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Generic, Iterable, List, Tuple, TypeVar
+
+NormalizedType = TypeVar('NormalizedType')
+
+
+@dataclass(frozen=True)
+class BulkResult(Generic[NormalizedType]):
+    # One entry per input row. Rows that failed have a value of None and an
+    # error message, formatted like batch errors, e.g.,
+    # "ValidationException: Start date missing".
+    values: Tuple[NormalizedType | None, ...]
+    errors: Tuple[str | None, ...]
+
+    def error_mask(self) -> Tuple[bool, ...]:
+        return tuple(e is not None for e in self.errors)
+
+    def error_count(self) -> int:
+        return sum(1 for e in self.errors if e is not None)
+
+
+def to_list(inputs: Iterable[Any]) -> List[Any]:
+    # NumPy arrays, and anything else with tolist, are converted in one call
+    # instead of element by element, without importing NumPy here.
+    tolist = getattr(inputs, 'tolist', None)
+    return list(tolist() if tolist is not None else inputs)
+
+
+def normalize_all(normalize: Callable[[Any], NormalizedType],
+                  inputs: Iterable[Any]) -> BulkResult[NormalizedType]:
+    # Columns repeat values, e.g., the same month across many work
+    # experiences, so each distinct input is normalized once.
+    outcomes: Dict[Any, Tuple[NormalizedType | None, str | None]] = {}
+
+    def normalize_one(input: Any) -> Tuple[NormalizedType | None, str | None]:
+        try:
+            return (normalize(input), None)
+        except Exception as e:
+            return (None, f'{type(e).__name__}: {e}')
+
+    def normalize_once(input: Any) -> Tuple[NormalizedType | None, str | None]:
+        if not isinstance(input, Hashable):
+            return normalize_one(input)
+        if input not in outcomes:
+            outcomes[input] = normalize_one(input)
+        return outcomes[input]
+
+    rows = [normalize_once(i) for i in to_list(inputs)]
+    return BulkResult(tuple(v for (v, _) in rows), tuple(e for (_, e) in rows))
@@ -1,9 +1,9 @@
 from conversion import bounded_text, location, number, time
 from dataclasses import dataclass
-from typing import FrozenSet
+from typing import Tuple
 
 
-@dataclass(eq=True, frozen=True)
+@dataclass(eq=True, frozen=True, slots=True)
 class Degree:
     program: bounded_text.BoundedText
     major: bounded_text.BoundedText
@@ -11,26 +11,26 @@ class Degree:
     emphasis: bounded_text.BoundedText | None = None
 
 
-@dataclass(eq=True, frozen=True)
+@dataclass(eq=True, frozen=True, slots=True)
 class InvolvementLevel:
     title: bounded_text.BoundedText
     start_date: time.Date
     end_date: time.Date
 
 
-@dataclass(eq=True, frozen=True)
+@dataclass(eq=True, frozen=True, slots=True)
 class Involvement:
     organization: bounded_text.BoundedText
-    levels: FrozenSet[InvolvementLevel]
+    levels: Tuple[InvolvementLevel, ...]
 
 
-@dataclass(eq=True, frozen=True)
+@dataclass(eq=True, frozen=True, slots=True)
 class Education:
     degree: Degree
     institution: bounded_text.BoundedText
     institution_location: location.Location
     start_date: time.Date
     end_date: time.Date
-    notable_coursework: FrozenSet[bounded_text.BoundedText]
-    involvement: FrozenSet[Involvement]
+    notable_coursework: Tuple[bounded_text.BoundedText, ...]
+    involvement: Tuple[Involvement, ...]
     gpa: number.Number
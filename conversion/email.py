@@ -1,10 +1,13 @@
+from conversion import bulk
 from conversion.validation import ValidationException
-from typing import Protocol, Tuple
+from typing import Iterable, Protocol, Tuple
 import re
 
 
 class Email():
 
+    __slots__ = ('__user_name', '__domain_name')
+
     def __init__(self, user_name: str, domain_name: str):
         self.__user_name = user_name
         self.__domain_name = domain_name
@@ -58,6 +61,12 @@ class FromEmailString(EmailFactory):
         return Email(user_name, domain_name)
 
 
+def create_all(parser: EmailParser,
+               inputs: Iterable[str]) -> bulk.BulkResult[Email]:
+    return bulk.normalize_all(lambda i: FromEmailString(parser, i).create(),
+                              inputs)
+
+
 class EmailFormatter:
 
     def format(self, email: Email) -> str:
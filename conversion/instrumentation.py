@@ -0,0 +1,85 @@
+from contextlib import contextmanager
+from threading import Lock
+from typing import Any, Dict, Iterator
+import time
+
+
+class Timings:
+
+    def __init__(self):
+        self.__lock = Lock()
+        self.__calls: Dict[str, int] = {}
+        self.__seconds: Dict[str, float] = {}
+
+    def record(self, name: str, seconds: float, calls: int = 1) -> None:
+        with self.__lock:
+            self.__calls[name] = self.__calls.get(name, 0) + calls
+            self.__seconds[name] = self.__seconds.get(name, 0.0) + seconds
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def merge(self, other: Dict[str, Dict[str, Any]]) -> None:
+        for (name, entry) in other.items():
+            self.record(name, entry['seconds'], entry['calls'])
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        with self.__lock:
+            return self.__to_dict()
+
+    def take(self) -> Dict[str, Dict[str, Any]]:
+        with self.__lock:
+            taken = self.__to_dict()
+            self.__calls.clear()
+            self.__seconds.clear()
+            return taken
+
+    def __to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            n: {
+                'calls': self.__calls[n],
+                'seconds': self.__seconds[n]
+            }
+            for n in sorted(self.__calls.keys())
+        }
+
+
+def get_component_name(component: Any) -> str:
+    # Wrappers, e.g., Timed, report the name of the component they wrap.
+    component_name = getattr(component, 'component_name', None)
+    if component_name is not None:
+        return component_name()
+
+    component_type = type(component)
+    module_name = component_type.__module__.split('.')[-1]
+    return f'{module_name}.{component_type.__qualname__}'
+
+
+class Timed:
+
+    # Stands in for any parser, converter or formatter and records each call
+    # under the wrapped type's name, e.g., "time.YearMonthParser.parse".
+    def __init__(self, inner: Any, timings: Timings):
+        self.__inner = inner
+        self.__timings = timings
+        self.__name = get_component_name(inner)
+
+    def component_name(self) -> str:
+        return self.__name
+
+    def parse(self, input: Any) -> Any:
+        with self.__timings.measure(f'{self.__name}.parse'):
+            return self.__inner.parse(input)
+
+    def convert(self, input: Any) -> Any:
+        with self.__timings.measure(f'{self.__name}.convert'):
+            return self.__inner.convert(input)
+
+    def format(self, input: Any) -> Any:
+        with self.__timings.measure(f'{self.__name}.format'):
+            return self.__inner.format(input)
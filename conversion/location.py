@@ -5,12 +5,16 @@ from typing import Iterable, List, Protocol, Tuple
 
 class PlaceIdentifier(Protocol):
 
+    __slots__ = ()
+
     def to_segmented_string(self) -> List[str]:
         ...
 
 
 class PlaceName(PlaceIdentifier):
 
+    __slots__ = ('__value', )
+
     def __init__(self, value: str):
         self.__value = value
 
@@ -20,6 +24,8 @@ class PlaceName(PlaceIdentifier):
 
 class PlaceIdentifierCollection(PlaceIdentifier):
 
+    __slots__ = ('__place_identifiers', )
+
     def __init__(self, *place_identifiers: PlaceIdentifier):
         self.__place_identifiers = place_identifiers
 
@@ -32,6 +38,8 @@ class PlaceIdentifierCollection(PlaceIdentifier):
 
 class Location(Protocol):
 
+    __slots__ = ()
+
     def value(self) -> PlaceIdentifierCollection:
         ...
 
@@ -41,6 +49,8 @@ class Location(Protocol):
 
 class CityAndStateLocation(Location):
 
+    __slots__ = ('__place', )
+
     def __init__(self, city: PlaceName, state: PlaceName):
         self.__place = PlaceIdentifierCollection(city, state)
 
@@ -53,6 +63,8 @@ class CityAndStateLocation(Location):
 
 class RemoteLocation(Location):
 
+    __slots__ = ('__location', )
+
     def __init__(self, location: Location):
         self.__location = location
 
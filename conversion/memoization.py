@@ -0,0 +1,105 @@
+from collections import OrderedDict
+from conversion import instrumentation, location, time
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Tuple
+import time as perf_time
+
+
+class LruCache:
+
+    def __init__(self, max_size: int):
+        self.__max_size = max(max_size, 0)
+        self.__lock = Lock()
+        self.__entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        with self.__lock:
+            if key not in self.__entries:
+                self.__misses += 1
+                return (False, None)
+
+            self.__hits += 1
+            self.__entries.move_to_end(key)
+            return (True, self.__entries[key])
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self.__lock:
+            self.__entries[key] = value
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__max_size:
+                self.__entries.popitem(last=False)
+                self.__evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self.__lock:
+            return {
+                'hits': self.__hits,
+                'misses': self.__misses,
+                'evictions': self.__evictions,
+                'size': len(self.__entries),
+                'max_size': self.__max_size
+            }
+
+
+def by_input(input: Hashable) -> Hashable:
+    return input
+
+
+def by_date_value(date: time.Date) -> Hashable:
+    return date.value()
+
+
+def by_location_segments(loc: location.Location) -> Hashable:
+    # Remote and on-site locations in the same place format differently.
+    return (type(loc), tuple(loc.value().to_segmented_string()))
+
+
+def by_number_value(number: Any) -> Hashable:
+    return number.value()
+
+
+class Memoized:
+
+    # Stands in for a parser or formatter and reuses the result of an earlier
+    # call with an equal key. Errors are not cached, so invalid input raises
+    # every time. With timings, hits and misses are counted under the wrapped
+    # type's name, e.g., "memoized.time.YearMonthParser.parse.hit".
+    def __init__(self,
+                 inner: Any,
+                 key: Callable[[Any], Hashable],
+                 max_size: int,
+                 timings: instrumentation.Timings | None = None):
+        self.__inner = inner
+        self.__key = key
+        self.__cache = LruCache(max_size)
+        self.__timings = timings
+        self.__name = instrumentation.get_component_name(inner)
+
+    def parse(self, input: Any) -> Any:
+        return self.__call('parse', self.__inner.parse, input)
+
+    def format(self, input: Any) -> Any:
+        return self.__call('format', self.__inner.format, input)
+
+    def component_name(self) -> str:
+        return self.__name
+
+    def stats(self) -> Dict[str, int]:
+        return self.__cache.stats()
+
+    def __call(self, method: str, fn: Callable[[Any], Any], input: Any) -> Any:
+        start = perf_time.perf_counter()
+        key = (method, self.__key(input))
+        (found, value) = self.__cache.get(key)
+        if not found:
+            value = fn(input)
+            self.__cache.put(key, value)
+
+        if self.__timings is not None:
+            outcome = 'hit' if found else 'miss'
+            self.__timings.record(f'memoized.{self.__name}.{method}.{outcome}',
+                                  perf_time.perf_counter() - start)
+        return value
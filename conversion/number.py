@@ -1,10 +1,13 @@
+from dataclasses import dataclass
 from enum import Enum, Flag
-from typing import Protocol
+from typing import Iterator, Protocol, Tuple
 import locale
 
 
 class Number:
 
+    __slots__ = ('__input', )
+
     def __init__(self, input: float):
         self.__input = input
 
@@ -50,3 +53,113 @@ class ScaledNumberFormatter(NumberFormatter):
                                     value,
                                     grouping=grouping,
                                     monetary=monetary)
+
+
+@dataclass(frozen=True, slots=True)
+class NumberConventions:
+    decimal_point: str
+    thousands_sep: str
+    grouping: Tuple[int, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class LocaleNumberConventions:
+    numeric: NumberConventions
+    monetary: NumberConventions
+
+
+class FromLocale:
+
+    # Reads a locale's conventions once, at configuration time. With a locale
+    # name, LC_NUMERIC and LC_MONETARY are switched to it while reading and
+    # restored after, so it belongs in configuration, before other threads
+    # format with ScaledNumberFormatter.
+    def __init__(self, locale_name: str | None = None):
+        self.__locale_name = locale_name
+
+    def create(self) -> LocaleNumberConventions:
+        if self.__locale_name is None:
+            return self.__read()
+
+        categories = (locale.LC_NUMERIC, locale.LC_MONETARY)
+        previous = [locale.setlocale(c) for c in categories]
+        try:
+            for c in categories:
+                locale.setlocale(c, self.__locale_name)
+            return self.__read()
+        finally:
+            for (c, p) in zip(categories, previous):
+                locale.setlocale(c, p)
+
+    @staticmethod
+    def __read() -> LocaleNumberConventions:
+        conv = locale.localeconv()
+        return LocaleNumberConventions(
+            NumberConventions(conv['decimal_point'], conv['thousands_sep'],
+                              tuple(conv['grouping'])),
+            NumberConventions(conv['mon_decimal_point'],
+                              conv['mon_thousands_sep'],
+                              tuple(conv['mon_grouping'])))
+
+
+def get_grouping_intervals(grouping: Tuple[int, ...]) -> Iterator[int]:
+    # Follows localeconv: CHAR_MAX ends grouping and 0 repeats the last
+    # interval.
+    last_interval = None
+    for interval in grouping:
+        if interval == locale.CHAR_MAX:
+            return
+        if interval == 0:
+            if last_interval is None:
+                raise ValueError('invalid grouping')
+            while True:
+                yield last_interval
+        yield interval
+        last_interval = interval
+
+
+class TableNumberFormatter(NumberFormatter):
+
+    # Gives the same output as ScaledNumberFormatter with the conventions of
+    # the locale they were read from, but never reads process-wide locale
+    # state, so it can be shared between threads rendering for different
+    # locales.
+    def __init__(self, scale: Scale, flags: NumberFormattingFlags,
+                 conventions: LocaleNumberConventions):
+        monetary = NumberFormattingFlags.MONETARY in flags
+        grouping = NumberFormattingFlags.GROUPING in flags
+        set_conventions = conventions.monetary if monetary else conventions.numeric
+
+        self.__format = f'%0.{scale.value}f'
+        self.__decimal_point = set_conventions.decimal_point
+        self.__thousands_sep = set_conventions.thousands_sep
+        self.__grouping = set_conventions.grouping if grouping else ()
+
+    def format(self, number: Number) -> str:
+        formatted = self.__format % number.value()
+        if '.' not in formatted:
+            # e.g., "nan" and "inf"
+            return self.__group(formatted)
+
+        (integer, fraction) = formatted.split('.')
+        return f'{self.__group(integer)}{self.__decimal_point}{fraction}'
+
+    def __group(self, s: str) -> str:
+        # The same grouping as locale.format_string. Fixed-point formats have
+        # no width, so there is no padding to trim.
+        if len(self.__grouping) == 0:
+            return s
+
+        sign = ''
+        groups = []
+        for interval in get_grouping_intervals(self.__grouping):
+            if not s or s[-1] not in '0123456789':
+                (sign, s) = (s, '')
+                break
+            groups.append(s[-interval:])
+            s = s[:-interval]
+        if s:
+            groups.append(s)
+
+        groups.reverse()
+        return sign + self.__thousands_sep.join(groups)
@@ -1,7 +1,8 @@
+from conversion import bulk
 from conversion.validation import ValidationException
 from enum import Enum
 from itertools import accumulate, zip_longest
-from typing import Iterable, List, Protocol, Tuple
+from typing import Dict, Iterable, List, Protocol, Sequence, Tuple
 import re
 
 
@@ -73,6 +74,8 @@ class PhoneNumberDigit(Enum):
 
 class Digits(Protocol):
 
+    __slots__ = ()
+
     def count(self) -> int:
         ...
 
@@ -80,70 +83,71 @@ class Digits(Protocol):
         ...
 
 
+# Fixed-length digit sequences keep only their string, built once when
+# created, since that is all they are read for.
 class OneDigit(Digits):
 
+    __slots__ = ('__value', )
+
     def __init__(self, first: PhoneNumberDigit):
-        self.__first = first
+        self.__value = PhoneNumberDigit.many_to_string(first)
 
     def count(self) -> int:
         return 1
 
     def to_segmented_string(self) -> List[str]:
-        return [PhoneNumberDigit.many_to_string(self.__first)]
+        return [self.__value]
 
 
 class TwoDigits(Digits):
 
+    __slots__ = ('__value', )
+
     def __init__(self, first: PhoneNumberDigit, second: PhoneNumberDigit):
-        self.__first = first
-        self.__second = second
+        self.__value = PhoneNumberDigit.many_to_string(first, second)
 
     def count(self) -> int:
         return 2
 
     def to_segmented_string(self) -> List[str]:
-        return [PhoneNumberDigit.many_to_string(self.__first, self.__second)]
+        return [self.__value]
 
 
 class ThreeDigits(Digits):
 
+    __slots__ = ('__value', )
+
     def __init__(self, first: PhoneNumberDigit, second: PhoneNumberDigit,
                  third: PhoneNumberDigit):
-        self.__first = first
-        self.__second = second
-        self.__third = third
+        self.__value = PhoneNumberDigit.many_to_string(first, second, third)
 
     def count(self) -> int:
         return 3
 
     def to_segmented_string(self) -> List[str]:
-        return [
-            PhoneNumberDigit.many_to_string(self.__first, self.__second,
-                                            self.__third)
-        ]
+        return [self.__value]
 
 
 class FourDigits(Digits):
 
+    __slots__ = ('__value', )
+
     def __init__(self, first: PhoneNumberDigit, second: PhoneNumberDigit,
                  third: PhoneNumberDigit, fourth: PhoneNumberDigit):
-        self.__first = first
-        self.__second = second
-        self.__third = third
-        self.__fourth = fourth
+        self.__value = PhoneNumberDigit.many_to_string(first, second, third,
+                                                       fourth)
 
     def count(self) -> int:
         return 4
 
     def to_segmented_string(self) -> List[str]:
-        return [
-            PhoneNumberDigit.many_to_string(self.__first, self.__second,
-                                            self.__third, self.__fourth)
-        ]
+        return [self.__value]
 
 
 class DigitsCollection(Digits):
 
+    __slots__ = ('__count', '__segmented_string')
+
     __create_key = object()
 
     def __init__(self, create_key, digit_sequences_acc: List[Tuple[int,
@@ -151,7 +155,9 @@ class DigitsCollection(Digits):
         assert create_key == DigitsCollection.__create_key, \
             "DigitsCollection objects must be created using DigitsCollection.create"
 
-        self.__digit_sequences_acc = digit_sequences_acc
+        self.__count = sum([acc[0] for acc in digit_sequences_acc])
+        self.__segmented_string = tuple(d for ds in digit_sequences_acc
+                                        for d in ds[1].to_segmented_string())
 
     @classmethod
     def create(cls, *digit_sequences: Digits):
@@ -160,17 +166,16 @@ class DigitsCollection(Digits):
         return DigitsCollection(cls.__create_key, [*digit_count_accumulations])
 
     def count(self) -> int:
-        return sum([acc[0] for acc in self.__digit_sequences_acc])
+        return self.__count
 
     def to_segmented_string(self) -> List[str]:
-        return [
-            d for ds in self.__digit_sequences_acc
-            for d in ds[1].to_segmented_string()
-        ]
+        return list(self.__segmented_string)
 
 
 class PhoneNumber(Protocol):
 
+    __slots__ = ()
+
     def digits(self) -> Digits:
         ...
 
@@ -180,6 +185,8 @@ class PhoneNumber(Protocol):
 
 class USPhoneNumber(PhoneNumber):
 
+    __slots__ = ('__phone_number_digits', )
+
     def __init__(self, area_code: ThreeDigits, tele_prefix: ThreeDigits,
                  line_number: FourDigits):
         country_code = OneDigit(PhoneNumberDigit.from_int(1))
@@ -193,18 +200,49 @@ class USPhoneNumber(PhoneNumber):
         return formatter.format(self)
 
 
+class CompactUSPhoneNumber(PhoneNumber, Digits):
+
+    # The country code, area code, prefix and line number are held as a single
+    # int, e.g., 15551234567, and are their own digits.
+    __slots__ = ('__value', )
+
+    def __init__(self, value: int):
+        self.__value = value
+
+    def digits(self) -> Digits:
+        return self
+
+    def count(self) -> int:
+        return 11
+
+    def to_segmented_string(self) -> List[str]:
+        s = str(self.__value)
+        return [s[0:1], s[1:4], s[4:7], s[7:11]]
+
+    def to_string(self, formatter) -> str:
+        return formatter.format(self)
+
+
+_PHONE_NUMBER_REGEX = re.compile(
+    r'^\+?\d{1,4}?[-.\s]?\(?\d{1,3}?\)?[-.\s]?\d{1,4}[-.\s]?\d{1,4}[-.\s]?\d{1,9}$'
+)
+_NON_DIGIT_REGEX = re.compile(r'[^0-9]')
+
+# Parsed digits are either one PhoneNumberDigit per digit or, for the compact
+# parser, the ASCII digits as bytes, e.g., b"5551234567".
+PhoneNumberDigits = Sequence[PhoneNumberDigit] | bytes
+
+
 class PhoneNumberParser(Protocol):
 
-    def parse(self, input: str) -> List[PhoneNumberDigit]:
+    def parse(self, input: str) -> PhoneNumberDigits:
         ...
 
 
 class RegexPhoneNumberParser(PhoneNumberParser):
 
-    __r_match = re.compile(
-        r'^\+?\d{1,4}?[-.\s]?\(?\d{1,3}?\)?[-.\s]?\d{1,4}[-.\s]?\d{1,4}[-.\s]?\d{1,9}$'
-    )
-    __r_sub = re.compile(r'[^0-9]')
+    __r_match = _PHONE_NUMBER_REGEX
+    __r_sub = _NON_DIGIT_REGEX
 
     def parse(self, input: str) -> List[PhoneNumberDigit]:
         trimmed = input.strip()
@@ -218,9 +256,28 @@ class RegexPhoneNumberParser(PhoneNumberParser):
         return [PhoneNumberDigit.from_int(int(d)) for d in sanitized]
 
 
+class CompactRegexPhoneNumberParser(PhoneNumberParser):
+
+    __r_match = _PHONE_NUMBER_REGEX
+    __r_sub = _NON_DIGIT_REGEX
+
+    def parse(self, input: str) -> bytes:
+        trimmed = input.strip()
+        matching = CompactRegexPhoneNumberParser.__r_match.match(trimmed)
+
+        if matching is None:
+            raise ValidationException(
+                'Unable to extract phone number digits from input')
+
+        # Only ASCII digits survive the substitution.
+        sanitized = CompactRegexPhoneNumberParser.__r_sub.sub(
+            '', matching.string)
+        return sanitized.encode('ascii')
+
+
 class DigitsToPhoneNumberConverter(Protocol):
 
-    def convert(self, digits: List[PhoneNumberDigit]) -> PhoneNumber:
+    def convert(self, digits: PhoneNumberDigits) -> PhoneNumber:
         ...
 
 
@@ -252,6 +309,29 @@ class USDigitsToPhoneNumberConverter(DigitsToPhoneNumberConverter):
                     f'Unexpected length for US phone number: {num_digits}.')
 
 
+class CompactUSDigitsToPhoneNumberConverter(DigitsToPhoneNumberConverter):
+
+    __country_code = 10**10
+
+    def convert(self, digits: bytes) -> PhoneNumber:
+        num_digits = len(digits)
+        match num_digits:
+            case 10 | 11:
+                # Like USDigitsToPhoneNumberConverter, a leading eleventh
+                # digit is dropped in favor of the US country code.
+                national_number = int(digits[num_digits - 10:num_digits])
+                return CompactUSPhoneNumber(
+                    CompactUSDigitsToPhoneNumberConverter.__country_code +
+                    national_number)
+            case 7:
+                raise ValidationException(
+                    'Unexpected length for US phone number. Are you missing the area code?'
+                )
+            case _:
+                raise ValidationException(
+                    f'Unexpected length for US phone number: {num_digits}.')
+
+
 class PhoneNumberFactory(Protocol):
 
     def create(self) -> PhoneNumber:
@@ -271,17 +351,36 @@ class FromDigitsStringToPhoneNumber(PhoneNumberFactory):
         return self.__converter.convert(digits)
 
 
+def create_all(parser: PhoneNumberParser,
+               converter: DigitsToPhoneNumberConverter,
+               inputs: Iterable[str]) -> bulk.BulkResult[PhoneNumber]:
+    return bulk.normalize_all(
+        lambda i: FromDigitsStringToPhoneNumber(parser, converter, i).create(),
+        inputs)
+
+
 class PhoneNumberSegmentFormatter(Protocol):
 
     def format(self, value: str) -> str:
         ...
 
 
+def get_segment_template(formatter: PhoneNumberSegmentFormatter,
+                         placeholder: str) -> str | None:
+    # Segment formatters that can be expressed as a str.format template, with
+    # the segment at the given placeholder, implement to_template.
+    to_template = getattr(formatter, 'to_template', None)
+    return None if to_template is None else to_template(placeholder)
+
+
 class NoChangePhoneNumberSegmentFormatter(PhoneNumberSegmentFormatter):
 
     def format(self, value: str) -> str:
         return value
 
+    def to_template(self, placeholder: str) -> str:
+        return placeholder
+
 
 class OmitSegmentFormatter(PhoneNumberSegmentFormatter):
 
@@ -289,6 +388,10 @@ class OmitSegmentFormatter(PhoneNumberSegmentFormatter):
         _ = value  # Consume arg. Makes warning go away, but we don't need it
         return ''
 
+    def to_template(self, placeholder: str) -> str:
+        _ = placeholder
+        return ''
+
 
 class TrailingDotSegmentFormatter(PhoneNumberSegmentFormatter):
 
@@ -301,6 +404,10 @@ class TrailingDotSegmentFormatter(PhoneNumberSegmentFormatter):
         s = self.__nested_formatter.format(value)
         return f'{s}.'
 
+    def to_template(self, placeholder: str) -> str | None:
+        nested = get_segment_template(self.__nested_formatter, placeholder)
+        return None if nested is None else f'{nested}.'
+
 
 class PhoneNumberFormatter(Protocol):
 
@@ -336,3 +443,46 @@ class OrdinalPhoneNumberFormatter(PhoneNumberFormatter):
     def __zip_with_trunc(
             *its) -> Iterable[Tuple[PhoneNumberSegmentFormatter, str]]:
         return zip(*its)
+
+
+class CompiledPhoneNumberFormatter(PhoneNumberFormatter):
+
+    # Formats exactly like OrdinalPhoneNumberFormatter, but compiles the
+    # segment formatters into one str.format template per segment count, e.g.,
+    # "{1}.{2}.{3}", so a number is formatted in a single call. Chains holding
+    # a segment formatter without a template are applied one by one instead.
+    def __init__(self, *segment_formatters: PhoneNumberSegmentFormatter):
+        self.__segment_formatters = segment_formatters
+        self.__ordinal_formatter = OrdinalPhoneNumberFormatter(
+            *segment_formatters)
+        self.__templates: Dict[int, str | None] = {}
+
+    def format(self, phone_number: PhoneNumber) -> str:
+        segmented_string = phone_number.digits().to_segmented_string()
+        template = self.__get_template(len(segmented_string))
+        if template is None:
+            return self.__ordinal_formatter.format(phone_number)
+
+        return template.format(*segmented_string)
+
+    def __get_template(self, segment_count: int) -> str | None:
+        # Compiling is idempotent, so threads racing on a new segment count
+        # store the same template.
+        if segment_count not in self.__templates:
+            self.__templates[segment_count] = self.__compile(segment_count)
+        return self.__templates[segment_count]
+
+    def __compile(self, segment_count: int) -> str | None:
+        # Missing formatters leave their segments unchanged and surplus
+        # formatters are ignored, as in OrdinalPhoneNumberFormatter.
+        padding = [NoChangePhoneNumberSegmentFormatter()] * max(
+            segment_count - len(self.__segment_formatters), 0)
+        formatters = [*self.__segment_formatters, *padding][0:segment_count]
+
+        templates = [
+            get_segment_template(f, f'{{{i}}}')
+            for (i, f) in enumerate(formatters)
+        ]
+        if any(t is None for t in templates):
+            return None
+        return ''.join(t for t in templates if t is not None)
@@ -1,6 +1,10 @@
-from conversion import bounded_text, education, email, location, number, phone_number, profile, project, ranked_entity, resume, technical_knowledge, time, work_experience
-from dataclasses import dataclass
-from typing import Any, Dict, FrozenSet
+from conversion import bounded_text, bulk, education, email, instrumentation, location, memoization, number, phone_number, profile, project, ranked_entity, resume, technical_knowledge, time, work_experience
+from dataclasses import dataclass, field, fields
+from typing import Any, Callable, Dict, FrozenSet, List, Sequence, Tuple, TypeVar
+import hashlib
+import heapq
+import json
+import time as perf_time
 
 
 @dataclass(frozen=True)
@@ -30,265 +34,654 @@ class Formatters:
     phone_number: phone_number.PhoneNumberFormatter
 
 
+@dataclass(frozen=True)
+class SectionLimits:
+    # The most items of each section a template shows. None shows them all.
+    work_experience: int | None = None
+    contributions: int | None = None
+    education: int | None = None
+    notable_coursework: int | None = None
+    involvement: int | None = None
+    involvement_levels: int | None = None
+    technical_knowledge: int | None = None
+    proficiencies: int | None = None
+    projects: int | None = None
+
+    def union(self, other: 'SectionLimits') -> 'SectionLimits':
+        # The limits that cover what either template shows.
+        def wider(a: int | None, b: int | None) -> int | None:
+            return None if a is None or b is None else max(a, b)
+
+        return SectionLimits(*[
+            wider(getattr(self, f.name), getattr(other, f.name))
+            for f in fields(self)
+        ])
+
+
+@dataclass(frozen=True)
+class FieldMask:
+    # The paths into template data a template reads, e.g.,
+    # ("education", "*", "gpa"), where "*" stands for every item of a list. A
+    # path covers everything below it, so the default, the empty path, covers
+    # all template data.
+    paths: FrozenSet[Tuple[str, ...]] = frozenset({()})
+    __has: Dict[Tuple[str, ...], bool] = field(default_factory=dict,
+                                               init=False,
+                                               compare=False,
+                                               repr=False)
+
+    def union(self, other: 'FieldMask') -> 'FieldMask':
+        return FieldMask(self.paths | other.paths)
+
+    def has(self, *path: str) -> bool:
+        # A field is needed when a read path ends at it, below it or above it.
+        # Answers are cached since the same fields are asked for every record.
+        if path not in self.__has:
+            self.__has[path] = any(
+                p[0:len(path)] == path or path[0:len(p)] == p
+                for p in self.paths)
+        return self.__has[path]
+
+    def restricted_to(self, name: str) -> 'FieldMask':
+        # The part of the mask covering one top-level section.
+        paths = {p for p in self.paths if p[0:1] == (name, )}
+        if () in self.paths:
+            paths.add((name, ))
+        return FieldMask(frozenset(paths))
+
+
+class FieldPresence:
+
+    # Answers FieldMask.has for the fields below one path, e.g., has.gpa for
+    # ("education", "*", "gpa") with a prefix of ("education", "*").
+    def __init__(self, mask: FieldMask, *prefix: str):
+        self.__mask = mask
+        self.__prefix = prefix
+
+    def __getattr__(self, name: str) -> bool:
+        return self.__mask.has(*self.__prefix, name)
+
+
 @dataclass(frozen=True)
 class Config:
     limits: Limits
     parsers: Parsers
     converters: Converters
     formatters: Formatters
+    clock: time.Clock = field(default_factory=time.SystemClock)
+
+
+def get_instrumented_config(config: Config,
+                            timings: instrumentation.Timings) -> Config:
+
+    def timed(inner: Any) -> Any:
+        return instrumentation.Timed(inner, timings)
+
+    parsers = Parsers(timed(config.parsers.date), timed(config.parsers.email),
+                      timed(config.parsers.phone_number))
+    converters = Converters(timed(config.converters.digits_to_phone_number))
+    formatters = Formatters(timed(config.formatters.date),
+                            timed(config.formatters.email),
+                            timed(config.formatters.location),
+                            timed(config.formatters.number),
+                            timed(config.formatters.phone_number))
+    return Config(config.limits, parsers, converters, formatters, config.clock)
+
+
+def get_memoized_config(
+        config: Config,
+        max_size: int,
+        timings: instrumentation.Timings | None = None) -> Config:
+
+    # Batches repeat the same dates, places and numbers across resumes, so
+    # parse and format results are cached by value. Email and phone number
+    # formatting cost about as much as building their keys and is left as is.
+    def memoized(inner: Any, key: Callable[[Any], Any]) -> Any:
+        return memoization.Memoized(inner, key, max_size, timings)
+
+    parsers = Parsers(
+        memoized(config.parsers.date, memoization.by_input),
+        memoized(config.parsers.email, memoization.by_input),
+        memoized(config.parsers.phone_number, memoization.by_input))
+    date_formatter = memoized(config.formatters.date,
+                              memoization.by_date_value)
+    location_formatter = memoized(config.formatters.location,
+                                  memoization.by_location_segments)
+    number_formatter = memoized(config.formatters.number,
+                                memoization.by_number_value)
+    formatters = Formatters(date_formatter, config.formatters.email,
+                            location_formatter, number_formatter,
+                            config.formatters.phone_number)
+    return Config(config.limits, parsers, config.converters, formatters,
+                  config.clock)
+
+
+class ColumnValidation:
+
+    # Collects the phone numbers, emails and dates of a whole batch into
+    # columns and validates each column in one bulk pass, so invalid records
+    # are found before any per-record conversion starts. Errors are keyed by
+    # record index and named after the field, e.g.,
+    # "workExperience[0].startDate: ValidationException: Start date missing".
+    def __init__(self, config: Config):
+        self.__date_parser = config.parsers.date
+        self.__email_parser = config.parsers.email
+        self.__phone_number_parser = config.parsers.phone_number
+        self.__digits_to_phone_number = config.converters.digits_to_phone_number
+        self.__normalizers = {
+            'phone_number': self.__phone_numbers,
+            'email': self.__emails,
+            'start_date': self.__start_dates,
+            'end_date': self.__end_dates
+        }
+
+    def get_errors(self, records: Sequence[Any]) -> Dict[int, List[str]]:
+        columns: Dict[str, List[Tuple[int, str, Any]]] = {
+            n: []
+            for n in self.__normalizers.keys()
+        }
+        errors: Dict[int, List[str]] = {}
 
+        for (i, r) in enumerate(records):
+            try:
+                self.__collect(columns, i, r)
+            except Exception as e:
+                errors.setdefault(i, []).append(f'{type(e).__name__}: {e}')
+
+        for (n, column) in columns.items():
+            result = self.__normalizers[n]([v for (_, _, v) in column])
+            for ((i, field_name, _), e) in zip(column, result.errors):
+                if e is not None:
+                    errors.setdefault(i, []).append(f'{field_name}: {e}')
+
+        return errors
+
+    def __phone_numbers(
+            self,
+            inputs: List[Any]) -> bulk.BulkResult[phone_number.PhoneNumber]:
+        return phone_number.create_all(self.__phone_number_parser,
+                                       self.__digits_to_phone_number, inputs)
+
+    def __emails(self, inputs: List[Any]) -> bulk.BulkResult[email.Email]:
+        return email.create_all(self.__email_parser, inputs)
+
+    def __start_dates(self, inputs: List[Any]) -> bulk.BulkResult[time.Date]:
+        return bulk.normalize_all(
+            lambda v: time.FromStartDate(self.__date_parser, v).create(),
+            inputs)
+
+    def __end_dates(self, inputs: List[Any]) -> bulk.BulkResult[time.Date]:
+        return bulk.normalize_all(
+            lambda v: time.FromEndDate(self.__date_parser, v).create(), inputs)
+
+    @staticmethod
+    def __collect(columns: Dict[str, List[Tuple[int, str, Any]]], index: int,
+                  record: Dict[str, Any]) -> None:
+        profile_data = record.get('profile')
+        columns['phone_number'].append(
+            (index, 'profile.phoneNumber', profile_data.get('phoneNumber')))
+        columns['email'].append(
+            (index, 'profile.email', profile_data.get('email')))
+
+        def collect_dates(prefix: str, data: Dict[str, Any]) -> None:
+            columns['start_date'].append(
+                (index, f'{prefix}.startDate', data.get('startDate')))
+            columns['end_date'].append(
+                (index, f'{prefix}.endDate', data.get('endDate')))
+
+        for (i, we) in enumerate(record.get('workExperience')):
+            collect_dates(f'workExperience[{i}]', we)
+        for (i, e) in enumerate(record.get('education')):
+            collect_dates(f'education[{i}]', e)
+            for (j, inv) in enumerate(e.get('involvement')):
+                for (k, l) in enumerate(inv.get('levels')):
+                    collect_dates(
+                        f'education[{i}].involvement[{j}].levels[{k}]', l)
+
+
+ConvertedType = TypeVar('ConvertedType')
+
+
+def by_start_date_desc(v) -> float:
+    return -v.start_date.value().timestamp()
 
-class Process:
 
+def by_rank(v: ranked_entity.RankedEntity[Any]) -> float:
+    return v.rank().value()
+
+
+def by_upper_text(v: bounded_text.BoundedText) -> str:
+    return v.to_string().upper()
+
+
+def by_upper_organization(v: education.Involvement) -> str:
+    return v.organization.to_string().upper()
+
+
+class ConversionPlan:
+
+    # The plan is built once per Config. run_with used to define its helpers,
+    # sort keys and intermediate frozensets on every call; binding them here
+    # leaves only the per-record work on the hot path.
     def __init__(self, config: Config):
-        self.__config = config
-
-    def run_with(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        limits = self.__config.limits
-        parsers = self.__config.parsers
-        converters = self.__config.converters
-        formatters = self.__config.formatters
-
-        def iter(list_data, fn) -> FrozenSet[Any]:
-            return frozenset([fn(d) for d in list_data])
-
-        def get_short_text(text) -> bounded_text.BoundedText:
-            return bounded_text.BoundedText(limits.short_bounded_text, text)
-
-        def get_long_text(text) -> bounded_text.BoundedText:
-            return bounded_text.BoundedText(limits.long_bounded_text, text)
-
-        def get_ranked_text(
-                ranked_text, text_fn
-        ) -> ranked_entity.RankedEntity[bounded_text.BoundedText]:
-            return ranked_entity.RankedEntity(
-                number.Number(ranked_text['rank']),
-                text_fn(ranked_text['text']))
-
-        def get_short_ranked_text(
-            ranked_text
-        ) -> ranked_entity.RankedEntity[bounded_text.BoundedText]:
-            return get_ranked_text(ranked_text, get_short_text)
-
-        def get_long_ranked_text(
-            ranked_text
-        ) -> ranked_entity.RankedEntity[bounded_text.BoundedText]:
-            return get_ranked_text(ranked_text, get_long_text)
-
-        def get_location(location_data) -> location.Location:
-            return location.FromStringsToCityAndStateLocation(
-                location_data.get('city'),
-                location_data.get('state')).create()
-
-        def get_work_location(location_data) -> location.Location:
-            loc = get_location(location_data)
-            if location_data.get('remote') == True:
-                return location.RemoteLocation(loc)
-            return loc
-
-        def get_degree(degree_data) -> education.Degree:
-            program = get_short_text(degree_data.get('program'))
-            major = get_short_text(degree_data.get('major'))
-
-            degree_data_minor = degree_data.get('minor')
-            minor = None if degree_data_minor is None else get_short_text(
-                degree_data_minor)
-            degree_data_emphasis = degree_data.get('emphasis')
-            emphasis = None if degree_data_emphasis is None else get_short_text(
-                degree_data_emphasis)
-
-            return education.Degree(program, major, minor, emphasis)
-
-        def get_involvement_level(
-                involvement_leve_data) -> education.InvolvementLevel:
-            title = get_short_text(involvement_leve_data.get('title'))
-            start_date = time.FromStartDate(
-                parsers.date, involvement_leve_data.get('startDate')).create()
-            end_date = time.FromEndDate(
-                parsers.date, involvement_leve_data.get('endDate')).create()
-            return education.InvolvementLevel(title, start_date, end_date)
-
-        def get_involvement(involvement_data) -> education.Involvement:
-            organization = get_short_text(involvement_data.get('organization'))
-            levels = iter(involvement_data.get('levels'),
-                          get_involvement_level)
-            return education.Involvement(organization, levels)
-
-        def get_profile(profile_data) -> profile.Profile:
-            applicant_name = get_short_text(profile_data.get('name'))
+        self.__short_limit = config.limits.short_bounded_text
+        self.__long_limit = config.limits.long_bounded_text
+        self.__date_parser = config.parsers.date
+        self.__email_parser = config.parsers.email
+        self.__phone_number_parser = config.parsers.phone_number
+        self.__digits_to_phone_number = config.converters.digits_to_phone_number
+        self.__date_formatter = config.formatters.date
+        self.__email_formatter = config.formatters.email
+        self.__location_formatter = config.formatters.location
+        self.__number_formatter = config.formatters.number
+        self.__phone_number_formatter = config.formatters.phone_number
+        self.__clock = config.clock
+
+    @staticmethod
+    def iter(list_data,
+             fn: Callable[[Any], ConvertedType]) -> Tuple[ConvertedType, ...]:
+        return tuple([fn(d) for d in list_data])
+
+    def get_short_text(self, text) -> bounded_text.BoundedText:
+        return bounded_text.BoundedText(self.__short_limit, text)
+
+    def get_long_text(self, text) -> bounded_text.BoundedText:
+        return bounded_text.BoundedText(self.__long_limit, text)
+
+    def get_optional_short_text(self, text) -> bounded_text.BoundedText | None:
+        return None if text is None else self.get_short_text(text)
+
+    def get_short_ranked_text(
+            self, ranked_text
+    ) -> ranked_entity.RankedEntity[bounded_text.BoundedText]:
+        return ranked_entity.RankedEntity(
+            number.Number(ranked_text['rank']),
+            self.get_short_text(ranked_text['text']))
+
+    def get_long_ranked_text(
+            self, ranked_text
+    ) -> ranked_entity.RankedEntity[bounded_text.BoundedText]:
+        return ranked_entity.RankedEntity(
+            number.Number(ranked_text['rank']),
+            self.get_long_text(ranked_text['text']))
+
+    def get_start_date(self, value) -> time.Date:
+        return time.FromStartDate(self.__date_parser, value).create()
+
+    def get_end_date(self, value) -> time.Date:
+        return time.FromEndDate(self.__date_parser, value,
+                                self.__clock).create()
+
+    def get_location(self, location_data) -> location.Location:
+        return location.FromStringsToCityAndStateLocation(
+            location_data.get('city'), location_data.get('state')).create()
+
+    def get_work_location(self, location_data) -> location.Location:
+        loc = self.get_location(location_data)
+        if location_data.get('remote') == True:
+            return location.RemoteLocation(loc)
+        return loc
+
+    def get_degree(self, degree_data) -> education.Degree:
+        return education.Degree(
+            self.get_short_text(degree_data.get('program')),
+            self.get_short_text(degree_data.get('major')),
+            self.get_optional_short_text(degree_data.get('minor')),
+            self.get_optional_short_text(degree_data.get('emphasis')))
+
+    def get_involvement_level(
+            self, involvement_level_data) -> education.InvolvementLevel:
+        return education.InvolvementLevel(
+            self.get_short_text(involvement_level_data.get('title')),
+            self.get_start_date(involvement_level_data.get('startDate')),
+            self.get_end_date(involvement_level_data.get('endDate')))
+
+    def get_involvement(self, involvement_data) -> education.Involvement:
+        return education.Involvement(
+            self.get_short_text(involvement_data.get('organization')),
+            self.iter(involvement_data.get('levels'),
+                      self.get_involvement_level))
+
+    def get_profile(
+        self, profile_data, mask: FieldMask = FieldMask()) -> profile.Profile:
+        applicant_name = self.get_short_text(profile_data.get('name'))
+
+        # The phone number and email are only parsed when they are shown.
+        applicant_phone_number = None
+        if mask.has('profile', 'phone_number'):
             applicant_phone_number = phone_number.FromDigitsStringToPhoneNumber(
-                parsers.phone_number, converters.digits_to_phone_number,
+                self.__phone_number_parser, self.__digits_to_phone_number,
                 profile_data.get('phoneNumber')).create()
+
+        applicant_email = None
+        if mask.has('profile', 'email'):
             applicant_email = email.FromEmailString(
-                parsers.email, profile_data.get('email')).create()
-            return profile.Profile(applicant_name, applicant_phone_number,
-                                   applicant_email)
-
-        def get_work_experience(
-                work_experience_data) -> work_experience.WorkExperience:
-            company_name = get_short_text(
-                work_experience_data.get('companyName'))
-            work_location = get_work_location(
-                work_experience_data.get('location'))
-            title = get_short_text(work_experience_data.get('title'))
-            start_date = time.FromStartDate(
-                parsers.date, work_experience_data.get('startDate')).create()
-            end_date = time.FromEndDate(
-                parsers.date, work_experience_data.get('endDate')).create()
-            contributions = iter(work_experience_data.get('contributions'),
-                                 get_long_ranked_text)
-            return work_experience.WorkExperience(company_name, work_location,
-                                                  title, start_date, end_date,
-                                                  contributions)
-
-        def get_education(education_data) -> education.Education:
-            degree = get_degree(education_data.get('degree'))
-            institution = get_short_text(education_data.get('institution'))
-            institution_location = get_location(education_data.get('location'))
-            start_date = time.FromStartDate(
-                parsers.date, education_data.get('startDate')).create()
-            end_date = time.FromEndDate(
-                parsers.date, education_data.get('endDate')).create()
-            notable_coursework = iter(education_data.get('notableCoursework'),
-                                      get_short_text)
-            involvement = iter(education_data.get('involvement'),
-                               get_involvement)
-            gpa = number.Number(education_data.get('gpa'))
-            return education.Education(degree, institution,
-                                       institution_location, start_date,
-                                       end_date, notable_coursework,
-                                       involvement, gpa)
-
-        def get_technical_knowledge(
-            technical_knowledge_data
-        ) -> technical_knowledge.TechnicalKnowledge:
-            category = get_short_text(technical_knowledge_data.get('category'))
-            proficiencies = iter(technical_knowledge_data.get('proficiencies'),
-                                 get_short_ranked_text)
-            return technical_knowledge.TechnicalKnowledge(
-                category, proficiencies)
-
-        def get_ranked_technical_knowledge(
-            ranked_technical_knowledge_data
-        ) -> ranked_entity.RankedEntity[
-                technical_knowledge.TechnicalKnowledge]:
-            return ranked_entity.RankedEntity(
-                number.Number(ranked_technical_knowledge_data['rank']),
-                get_technical_knowledge(ranked_technical_knowledge_data))
-
-        def get_project(project_data) -> project.Project:
-            title = get_short_text(project_data.get('title'))
-            description = get_long_text(project_data.get('description'))
-            return project.Project(title, description)
-
-        def get_ranked_project(
-            ranked_project_data
-        ) -> ranked_entity.RankedEntity[project.Project]:
-            return ranked_entity.RankedEntity(
-                number.Number(ranked_project_data['rank']),
-                get_project(ranked_project_data))
-
-        applicant_resume = resume.Resume(
-            get_profile(data.get('profile')),
-            iter(data.get('workExperience'), get_work_experience),
-            iter(data.get('education'), get_education),
-            iter(data.get('technicalKnowledge'),
-                 get_ranked_technical_knowledge),
-            iter(data.get('projects'), get_ranked_project))
+                self.__email_parser, profile_data.get('email')).create()
+
+        return profile.Profile(applicant_name, applicant_phone_number,
+                               applicant_email)
+
+    def get_work_experience(
+            self, work_experience_data) -> work_experience.WorkExperience:
+        return work_experience.WorkExperience(
+            self.get_short_text(work_experience_data.get('companyName')),
+            self.get_work_location(work_experience_data.get('location')),
+            self.get_short_text(work_experience_data.get('title')),
+            self.get_start_date(work_experience_data.get('startDate')),
+            self.get_end_date(work_experience_data.get('endDate')),
+            self.iter(work_experience_data.get('contributions'),
+                      self.get_long_ranked_text))
+
+    def get_education(self, education_data) -> education.Education:
+        return education.Education(
+            self.get_degree(education_data.get('degree')),
+            self.get_short_text(education_data.get('institution')),
+            self.get_location(education_data.get('location')),
+            self.get_start_date(education_data.get('startDate')),
+            self.get_end_date(education_data.get('endDate')),
+            self.iter(education_data.get('notableCoursework'),
+                      self.get_short_text),
+            self.iter(education_data.get('involvement'), self.get_involvement),
+            number.Number(education_data.get('gpa')))
+
+    def get_ranked_technical_knowledge(
+        self, ranked_technical_knowledge_data
+    ) -> ranked_entity.RankedEntity[technical_knowledge.TechnicalKnowledge]:
+        return ranked_entity.RankedEntity(
+            number.Number(ranked_technical_knowledge_data['rank']),
+            technical_knowledge.TechnicalKnowledge(
+                self.get_short_text(
+                    ranked_technical_knowledge_data.get('category')),
+                self.iter(ranked_technical_knowledge_data.get('proficiencies'),
+                          self.get_short_ranked_text)))
+
+    def get_ranked_project(
+            self, ranked_project_data
+    ) -> ranked_entity.RankedEntity[project.Project]:
+        return ranked_entity.RankedEntity(
+            number.Number(ranked_project_data['rank']),
+            project.Project(
+                self.get_short_text(ranked_project_data.get('title')),
+                self.get_long_text(ranked_project_data.get('description'))))
+
+    def get_resume(
+        self, data: Dict[str,
+                         Any], mask: FieldMask = FieldMask()) -> resume.Resume:
+        # Sections a template never reads are left empty instead of being
+        # converted.
+        def section(
+                name: str, key: str,
+                fn: Callable[[Any],
+                             ConvertedType]) -> Tuple[ConvertedType, ...]:
+            return self.iter(data.get(key), fn) if mask.has(name) else ()
+
+        return resume.Resume(
+            self.get_profile(data.get('profile'), mask)
+            if mask.has('profile') else None,
+            section('work_experience', 'workExperience',
+                    self.get_work_experience),
+            section('education', 'education', self.get_education),
+            section('technical_knowledge', 'technicalKnowledge',
+                    self.get_ranked_technical_knowledge),
+            section('projects', 'projects', self.get_ranked_project))
+
+    @staticmethod
+    def sorted_by_rank(ranked_entities: Tuple[
+        ranked_entity.RankedEntity[ConvertedType], ...],
+                       limit: int | None = None) -> List[ConvertedType]:
+        if limit is None:
+            return [v.value() for v in sorted(ranked_entities, key=by_rank)]
+
+        return ranked_entity.RankedEntityCollection(
+            *ranked_entities).to_top_values(limit)
+
+    @staticmethod
+    def sorted_by(items: Tuple[ConvertedType, ...],
+                  key: Callable[[ConvertedType], Any],
+                  limit: int | None = None) -> List[ConvertedType]:
+        # heapq.nsmallest is equivalent to sorted(...)[:limit], ties included.
+        if limit is None:
+            return sorted(items, key=key)
+
+        return heapq.nsmallest(max(limit, 0), items, key=key)
+
+    def format_profile(self,
+                       p: profile.Profile | None) -> Dict[str, Any] | None:
+        if p is None:
+            return None
 
         return {
-            'profile': {
-                'name':
-                applicant_resume.applicant_profile.applicant_name.to_string(),
-                'phone_number':
-                applicant_resume.applicant_profile.applicant_phone_number.
-                to_string(formatters.phone_number),
-                'email':
-                applicant_resume.applicant_profile.applicant_email.to_string(
-                    formatters.email)
-            },
-            'work_experience': [{
-                'company_name':
-                we.company_name.to_string(),
-                'location':
-                we.work_location.to_string(formatters.location),
+            'name':
+            p.applicant_name.to_string(),
+            'phone_number':
+            None if p.applicant_phone_number is None else
+            p.applicant_phone_number.to_string(self.__phone_number_formatter),
+            'email':
+            None if p.applicant_email is None else p.applicant_email.to_string(
+                self.__email_formatter)
+        }
+
+    def format_work_experience(self, work_experiences: Tuple[
+        work_experience.WorkExperience, ...], limits: SectionLimits,
+                               mask: FieldMask) -> List[Dict[str, Any]]:
+        date_formatter = self.__date_formatter
+        has = FieldPresence(mask, 'work_experience', '*')
+        return [{
+            'company_name':
+            we.company_name.to_string(),
+            'location':
+            we.work_location.to_string(self.__location_formatter)
+            if has.location else None,
+            'title':
+            we.title.to_string(),
+            'start_date':
+            we.start_date.to_string(date_formatter)
+            if has.start_date else None,
+            'end_date':
+            we.end_date.to_string(date_formatter) if has.end_date else None,
+            'contributions': [
+                v.to_string() for v in self.sorted_by_rank(
+                    we.contributions, limits.contributions)
+            ] if has.contributions else None
+        } for we in self.sorted_by(work_experiences, by_start_date_desc,
+                                   limits.work_experience)]
+
+    def format_involvement(self, involvement: Tuple[education.Involvement,
+                                                    ...],
+                           limits: SectionLimits,
+                           mask: FieldMask) -> List[Dict[str, Any]]:
+        date_formatter = self.__date_formatter
+        has = FieldPresence(mask, 'education', '*', 'involvement', '*')
+        has_level = FieldPresence(mask, 'education', '*', 'involvement', '*',
+                                  'levels', '*')
+        return [{
+            'organization':
+            i.organization.to_string(),
+            'levels': [{
                 'title':
-                we.title.to_string(),
+                l.title.to_string(),
                 'start_date':
-                we.start_date.to_string(formatters.date),
+                l.start_date.to_string(date_formatter)
+                if has_level.start_date else None,
                 'end_date':
-                we.end_date.to_string(formatters.date),
-                'contributions': [
-                    v.to_string()
-                    for v in ranked_entity.RankedEntityCollection(
-                        *[c for c in we.contributions]).to_sorted_values()
-                ]
-            } for we in sorted(applicant_resume.applicant_work_experience,
-                               key=lambda v: v.start_date.value().timestamp(),
-                               reverse=True)],
-            'education': [{
-                'degree': {
-                    'program':
-                    e.degree.program.to_string(),
-                    'major':
-                    e.degree.major.to_string(),
-                    'minor':
-                    None
-                    if e.degree.minor is None else e.degree.minor.to_string(),
-                    'emphasis':
-                    None if e.degree.emphasis is None else
-                    e.degree.emphasis.to_string()
-                },
-                'institution':
-                e.institution.to_string(),
-                'location':
-                e.institution_location.to_string(formatters.location),
-                'start_date':
-                e.start_date.to_string(formatters.date),
-                'end_date':
-                e.end_date.to_string(formatters.date),
-                'notable_coursework': [
-                    nc.to_string()
-                    for nc in sorted(e.notable_coursework,
-                                     key=lambda v: v.to_string().upper())
-                ],
-                'involvement': [{
-                    'organization':
-                    i.organization.to_string(),
-                    'levels': [{
-                        'title':
-                        l.title.to_string(),
-                        'start_date':
-                        l.start_date.to_string(formatters.date),
-                        'end_date':
-                        l.end_date.to_string(formatters.date)
-                    } for l in sorted(
-                        i.levels,
-                        key=lambda v: v.start_date.value().timestamp(),
-                        reverse=True)]
-                } for i in sorted(
-                    e.involvement,
-                    key=lambda v: v.organization.to_string().upper())],
-                'gpa':
-                e.gpa.to_string(formatters.number)
-            } for e in sorted(applicant_resume.applicant_education,
-                              key=lambda v: v.start_date.value().timestamp(),
-                              reverse=True)],
-            'technical_knowledge': [{
-                'category':
-                v.category.to_string(),
-                'proficiencies': [
-                    t.to_string()
-                    for t in ranked_entity.RankedEntityCollection(
-                        *[p for p in v.proficiencies]).to_sorted_values()
-                ]
-            } for v in ranked_entity.RankedEntityCollection(
-                *[tk for tk in applicant_resume.applicant_technical_knowledge
-                  ]).to_sorted_values()],
-            'projects': [{
-                'title': v.title.to_string(),
-                'description': v.description.to_string()
-            } for v in ranked_entity.RankedEntityCollection(
-                *[p for p in applicant_resume.applicant_projects
-                  ]).to_sorted_values()]
+                l.end_date.to_string(date_formatter)
+                if has_level.end_date else None
+            } for l in self.sorted_by(i.levels, by_start_date_desc,
+                                      limits.involvement_levels)]
+            if has.levels else None
+        } for i in self.sorted_by(involvement, by_upper_organization,
+                                  limits.involvement)]
+
+    def format_education(self, educations: Tuple[education.Education,
+                                                 ...], limits: SectionLimits,
+                         mask: FieldMask) -> List[Dict[str, Any]]:
+        date_formatter = self.__date_formatter
+        has = FieldPresence(mask, 'education', '*')
+        return [{
+            'degree': {
+                'program':
+                e.degree.program.to_string(),
+                'major':
+                e.degree.major.to_string(),
+                'minor':
+                None if e.degree.minor is None else e.degree.minor.to_string(),
+                'emphasis':
+                None if e.degree.emphasis is None else
+                e.degree.emphasis.to_string()
+            },
+            'institution':
+            e.institution.to_string(),
+            'location':
+            e.institution_location.to_string(self.__location_formatter)
+            if has.location else None,
+            'start_date':
+            e.start_date.to_string(date_formatter) if has.start_date else None,
+            'end_date':
+            e.end_date.to_string(date_formatter) if has.end_date else None,
+            'notable_coursework': [
+                nc.to_string()
+                for nc in self.sorted_by(e.notable_coursework, by_upper_text,
+                                         limits.notable_coursework)
+            ] if has.notable_coursework else None,
+            'involvement':
+            self.format_involvement(e.involvement, limits, mask)
+            if has.involvement else None,
+            'gpa':
+            e.gpa.to_string(self.__number_formatter) if has.gpa else None
+        } for e in self.sorted_by(educations, by_start_date_desc,
+                                  limits.education)]
+
+    def format_technical_knowledge(self, technical_knowledges: Tuple[
+        ranked_entity.RankedEntity[technical_knowledge.TechnicalKnowledge],
+        ...], limits: SectionLimits, mask: FieldMask) -> List[Dict[str, Any]]:
+        has = FieldPresence(mask, 'technical_knowledge', '*')
+        return [{
+            'category':
+            v.category.to_string(),
+            'proficiencies': [
+                t.to_string() for t in self.sorted_by_rank(
+                    v.proficiencies, limits.proficiencies)
+            ] if has.proficiencies else None
+        } for v in self.sorted_by_rank(technical_knowledges,
+                                       limits.technical_knowledge)]
+
+    def format_projects(self, projects: Tuple[
+        ranked_entity.RankedEntity[project.Project], ...],
+                        limits: SectionLimits) -> List[Dict[str, Any]]:
+        return [{
+            'title': v.title.to_string(),
+            'description': v.description.to_string()
+        } for v in self.sorted_by_rank(projects, limits.projects)]
+
+    def format_resume(
+        self,
+        r: resume.Resume,
+        limits: SectionLimits = SectionLimits(),
+        mask: FieldMask = FieldMask()
+    ) -> Dict[str, Any]:
+        return {
+            'profile':
+            self.format_profile(r.applicant_profile),
+            'work_experience':
+            self.format_work_experience(r.applicant_work_experience, limits,
+                                        mask),
+            'education':
+            self.format_education(r.applicant_education, limits, mask),
+            'technical_knowledge':
+            self.format_technical_knowledge(r.applicant_technical_knowledge,
+                                            limits, mask),
+            'projects':
+            self.format_projects(r.applicant_projects, limits)
         }
+
+
+# Template data sections and the resume data each is built from.
+SECTION_KEYS = {
+    'profile': 'profile',
+    'work_experience': 'workExperience',
+    'education': 'education',
+    'technical_knowledge': 'technicalKnowledge',
+    'projects': 'projects'
+}
+
+
+def get_subtree_hash(data: Any) -> str:
+    canonical = json.dumps(data, sort_keys=True, separators=(',', ':'))
+    return hashlib.blake2b(canonical.encode('utf-8'),
+                           digest_size=16).hexdigest()
+
+
+class Process:
+
+    def __init__(self,
+                 config: Config,
+                 timings: instrumentation.Timings | None = None,
+                 section_cache_size: int = 0):
+        # With timings, every parser, converter and formatter is wrapped so
+        # calls are counted and timed per implementation, and run_with times
+        # its conversion and formatting stages.
+        set_config = config if timings is None else get_instrumented_config(
+            config, timings)
+
+        self.__config = set_config
+        self.__timings = timings
+        self.__plan = ConversionPlan(set_config)
+        self.__section_cache = None if section_cache_size <= 0 else memoization.LruCache(
+            section_cache_size)
+
+    def run_with(
+        self,
+        data: Dict[str, Any],
+        limits: SectionLimits = SectionLimits(),
+        mask: FieldMask = FieldMask()
+    ) -> Dict[str, Any]:
+        # Sections beyond their limit are neither sorted in full nor
+        # formatted, and fields outside the mask are left as None.
+        if self.__section_cache is not None:
+            return {
+                n: self.__run_section(n, data, limits, mask)
+                for n in SECTION_KEYS.keys()
+            }
+
+        if self.__timings is None:
+            applicant_resume = self.__plan.get_resume(data, mask)
+            return self.__plan.format_resume(applicant_resume, limits, mask)
+
+        with self.__timings.measure('process.convert'):
+            applicant_resume = self.__plan.get_resume(data, mask)
+        with self.__timings.measure('process.format'):
+            return self.__plan.format_resume(applicant_resume, limits, mask)
+
+    def section_cache_stats(self) -> Dict[str, int] | None:
+        return None if self.__section_cache is None else self.__section_cache.stats(
+        )
+
+    def __run_section(self, name: str, data: Dict[str, Any],
+                      limits: SectionLimits, mask: FieldMask) -> Any:
+        # A section is converted and formatted on its own, from its part of
+        # the resume data only, and reused while that part, the limits, the
+        # fields read and the present month, which "Present" end dates
+        # format as, are unchanged. Cached sections are shared between
+        # results, so template data must not be modified.
+        assert self.__section_cache is not None
+
+        key = SECTION_KEYS[name]
+        section_mask = mask.restricted_to(name)
+        present = self.__config.clock.now()
+        cache_key = (name, get_subtree_hash(data.get(key)), limits,
+                     section_mask, present.year, present.month)
+
+        start = perf_time.perf_counter()
+        (found, value) = self.__section_cache.get(cache_key)
+        if not found:
+            template_data = self.__plan.format_resume(
+                self.__plan.get_resume({key: data.get(key)}, section_mask),
+                limits, section_mask)
+            value = template_data[name]
+            self.__section_cache.put(cache_key, value)
+
+        if self.__timings is not None:
+            outcome = 'hit' if found else 'miss'
+            self.__timings.record(f'process.section.{name}.{outcome}',
+                                  perf_time.perf_counter() - start)
+        return value
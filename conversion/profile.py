@@ -2,8 +2,8 @@ from conversion import bounded_text, email, phone_number
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Profile:
     applicant_name: bounded_text.BoundedText
-    applicant_phone_number: phone_number.PhoneNumber
-    applicant_email: email.Email
+    applicant_phone_number: phone_number.PhoneNumber | None
+    applicant_email: email.Email | None
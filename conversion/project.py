@@ -2,7 +2,7 @@ from conversion import bounded_text
 from dataclasses import dataclass
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Project:
     title: bounded_text.BoundedText
     description: bounded_text.BoundedText
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from typing import Generic, List, TypeVar
+import heapq
 
 from conversion import number
 
@@ -8,6 +9,8 @@ RankedEntityType = TypeVar("RankedEntityType")
 
 class RankedEntity(Generic[RankedEntityType]):
 
+    __slots__ = ('__rank', '__value')
+
     def __init__(self, rank: number.Number, value: RankedEntityType):
         self.__rank = rank
         self.__value = value
@@ -46,3 +49,20 @@ class RankedEntityCollection(Generic[RankedEntityType]):
                                       key=lambda v: v.rank().value(),
                                       reverse=reverse)
         ]
+
+    def to_top_values(
+        self,
+        count: int,
+        options: RankedEntityCollectionSortOptions | None = None
+    ) -> List[RankedEntityType]:
+        # Selects the first count values of to_sorted_values, ties included,
+        # without sorting the whole collection.
+        set_options = options if options is not None else RankedEntityCollectionSortOptions.default(
+        )
+        select = heapq.nlargest if set_options.reverse else heapq.nsmallest
+
+        return [
+            v.value() for v in select(max(count, 0),
+                                      self.__ranked_entities,
+                                      key=lambda v: v.rank().value())
+        ]
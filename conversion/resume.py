@@ -1,13 +1,14 @@
 from conversion import education, profile, project, ranked_entity, technical_knowledge, work_experience
 from dataclasses import dataclass
-from typing import FrozenSet
+from typing import Tuple
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Resume:
-    applicant_profile: profile.Profile
-    applicant_work_experience: FrozenSet[work_experience.WorkExperience]
-    applicant_education: FrozenSet[education.Education]
-    applicant_technical_knowledge: FrozenSet[ranked_entity.RankedEntity[
-        technical_knowledge.TechnicalKnowledge]]
-    applicant_projects: FrozenSet[ranked_entity.RankedEntity[project.Project]]
+    applicant_profile: profile.Profile | None
+    applicant_work_experience: Tuple[work_experience.WorkExperience, ...]
+    applicant_education: Tuple[education.Education, ...]
+    applicant_technical_knowledge: Tuple[
+        ranked_entity.RankedEntity[technical_knowledge.TechnicalKnowledge],
+        ...]
+    applicant_projects: Tuple[ranked_entity.RankedEntity[project.Project], ...]
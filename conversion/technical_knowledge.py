@@ -1,10 +1,10 @@
 from conversion import bounded_text, ranked_entity
 from dataclasses import dataclass
-from typing import FrozenSet
+from typing import Tuple
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TechnicalKnowledge:
     category: bounded_text.BoundedText
-    proficiencies: FrozenSet[ranked_entity.RankedEntity[
-        bounded_text.BoundedText]]
+    proficiencies: Tuple[ranked_entity.RankedEntity[bounded_text.BoundedText],
+                         ...]
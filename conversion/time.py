@@ -1,10 +1,13 @@
-from conversion import validation
+from conversion import bulk, validation
 from datetime import datetime, timezone
-from typing import Protocol
+from typing import Dict, Iterable, Protocol, Tuple
+import re
 
 
 class Date(Protocol):
 
+    __slots__ = ()
+
     def value(self) -> datetime:
         ...
 
@@ -14,6 +17,8 @@ class Date(Protocol):
 
 class ValidDate(Date):
 
+    __slots__ = ('__value', )
+
     def __init__(self, value):
         self.__value = value
 
@@ -24,10 +29,36 @@ class ValidDate(Date):
         return formatter.format(self)
 
 
+class Clock(Protocol):
+
+    def now(self) -> datetime:
+        ...
+
+
+class SystemClock(Clock):
+
+    def now(self) -> datetime:
+        return datetime.now(timezone.utc)
+
+
+class SnapshotClock(Clock):
+
+    def __init__(self, snapshot: datetime):
+        self.__snapshot = snapshot
+
+    def now(self) -> datetime:
+        return self.__snapshot
+
+
 class PresentDate(Date):
 
+    __slots__ = ('__clock', )
+
+    def __init__(self, clock: Clock | None = None):
+        self.__clock = clock if clock is not None else SystemClock()
+
     def value(self) -> datetime:
-        return datetime.now(timezone.utc)
+        return self.__clock.now()
 
     def to_string(self, formatter) -> str:
         _ = formatter  # Consume arg. Makes warning go away, but we don't need it
@@ -49,6 +80,50 @@ class YearMonthParser(DateParser):
         return datetime.strptime(trimmed, self.__format)
 
 
+class FastYearMonthParser(DateParser):
+
+    # Accepts exactly what datetime.strptime accepts for "%Y-%m" and raises the
+    # same errors, but matches a precompiled copy of strptime's own pattern
+    # instead of going through strptime, which is slow and serializes callers
+    # on a module-level lock. Parsed dates are immutable and kept in a small
+    # cache. Single dict operations are atomic, so threads share the cache
+    # without a lock. It is cleared when full; concurrent clears are harmless.
+    __format = '%Y-%m'
+    __regex = re.compile(r'(?P<Y>\d\d\d\d)-(?P<m>1[0-2]|0[1-9]|[1-9])',
+                         re.IGNORECASE)
+
+    def __init__(self, cache_size: int = 512):
+        self.__cache_size = max(cache_size, 0)
+        self.__cache: Dict[str, datetime] = {}
+
+    def parse(self, input: str) -> datetime:
+        trimmed = input.strip()
+        cached = self.__cache.get(trimmed)
+        if cached is not None:
+            return cached
+
+        matching = FastYearMonthParser.__regex.match(trimmed)
+        if matching is None:
+            raise ValueError(f'time data {trimmed!r} does not match format '
+                             f'{FastYearMonthParser.__format!r}')
+        if matching.end() != len(trimmed):
+            raise ValueError(
+                f'unconverted data remains: {trimmed[matching.end():]}')
+
+        parsed = datetime(int(matching.group('Y')), int(matching.group('m')),
+                          1)
+        if self.__cache_size > 0:
+            if len(self.__cache) >= self.__cache_size:
+                self.__cache.clear()
+            self.__cache[trimmed] = parsed
+        return parsed
+
+
+def parse_all(parser: DateParser,
+              inputs: Iterable[str]) -> bulk.BulkResult[datetime]:
+    return bulk.normalize_all(parser.parse, inputs)
+
+
 class DateFactory(Protocol):
 
     def create(self) -> Date:
@@ -71,13 +146,17 @@ class FromStartDate(DateFactory):
 
 class FromEndDate(DateFactory):
 
-    def __init__(self, parser: DateParser, value: str):
+    def __init__(self,
+                 parser: DateParser,
+                 value: str,
+                 clock: Clock | None = None):
         self.__parser = parser
         self.__value = value
+        self.__clock = clock
 
     def create(self) -> Date:
         if self.__value is None:
-            return PresentDate()
+            return PresentDate(self.__clock)
 
         parsed_date = self.__parser.parse(self.__value)
         return ValidDate(parsed_date)
@@ -99,3 +178,25 @@ class FullMonthNameYearFormatter(DateFormatter):
             "Cannot format classes implementing the Date protocol via the null-object pattern"
 
         return value.strftime(self.__format)
+
+
+def get_full_month_names() -> Tuple[str, ...]:
+    # The current locale's month names, as "%B" formats them, from January to
+    # December.
+    return tuple(datetime(2000, m, 1).strftime('%B') for m in range(1, 13))
+
+
+class TableFullMonthNameYearFormatter(DateFormatter):
+
+    # Formats like FullMonthNameYearFormatter, but looks month names up in a
+    # table read at configuration time instead of calling strftime, which
+    # reads process-wide locale state on every call.
+    def __init__(self, month_names: Tuple[str, ...]):
+        self.__month_names = month_names
+
+    def format(self, date):
+        value = date.value()
+        assert value is not None, \
+            "Cannot format classes implementing the Date protocol via the null-object pattern"
+
+        return f'{self.__month_names[value.month - 1]} {value.year}'
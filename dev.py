@@ -1,18 +1,28 @@
 from argparse import ArgumentParser
+from collections import Counter, deque
 from contextlib import contextmanager
 from dataclasses import dataclass
+from enum import Enum
 from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
-from queue import Full, Queue
+from os import fdopen, getpgid, killpg, makedirs, path, replace
+from signal import SIGTERM
 from subprocess import DEVNULL, STDOUT, Popen
-from threading import Event, Lock, Thread
-from typing import Callable, Protocol, Set, TypeVar
+from tempfile import mkstemp
+from threading import Condition, Event, Lock, Thread
+from time import monotonic
+from types import ModuleType
+from typing import Any, Callable, Deque, Dict, FrozenSet, List, Protocol, Set, Tuple, TypeVar
 from tomllib import load as load_toml
+import importlib
+import sys
 
 from watchdog.events import FileSystemEvent, FileSystemEventHandler
 from watchdog.observers import Observer
 from websockets.exceptions import ConnectionClosedOK
 from websockets.sync.server import ServerConnection, serve as serve_websocket
 
+import main as generator
+
 Callback = Callable[[], None]
 
 
@@ -46,68 +56,453 @@ class Legion(Daemon):
             d.join()
 
 
-class ProcessFactory(Protocol):
+class Build(Protocol):
 
-    def create(self) -> Popen:
+    def wait(self) -> bool:
         ...
 
+    def cancel(self) -> None:
+        ...
 
-class ProcessRequest(Protocol):
 
-    pass
+class BuildFactory(Protocol):
 
+    def create(self, changed_paths: FrozenSet[str]) -> Build:
+        ...
 
-class NoProcessRequest(ProcessRequest):
 
-    pass
+@dataclass
+class RebuildSchedulerOptions:
+    debounce_seconds: float
+
+
+class RebuildScheduler:
+
+    # Bursts of file system events, e.g., the three to five an editor emits
+    # for one save, are coalesced into one build that starts once no event
+    # has arrived for the debounce window. Every request starts a new build
+    # generation. A request arriving while a build runs cancels that build,
+    # and a build only reports success when no newer request arrived while it
+    # ran, so the browser only reloads for the newest build.
+    def __init__(self, build_factory: BuildFactory,
+                 rebuild_scheduler_options: RebuildSchedulerOptions,
+                 on_build_success: Callback) -> None:
+        self._build_factory = build_factory
+        self._debounce_seconds = max(
+            rebuild_scheduler_options.debounce_seconds, 0)
+        self._on_build_success = on_build_success
+
+        self._condition = Condition()
+        self._shutdown = False
+        self._requested_generation = 0
+        self._built_generation = 0
+        self._deadline = 0.0
+        self._changed_paths: Set[str] = set()
+        self._build: Build | None = None
+
+    def request_rebuild(self, changed_path: str) -> None:
+        with self._condition:
+            self._requested_generation += 1
+            self._deadline = monotonic() + self._debounce_seconds
+            self._changed_paths.add(changed_path)
+            if self._build is not None:
+                print('cancelling stale build')
+                self._build.cancel()
+            self._condition.notify_all()
 
+    def serve_forever(self) -> None:
+        with self._condition:
+            self._shutdown = False
 
-class CreateProcessRequest(ProcessRequest):
+        while True:
+            request = self._wait_for_quiet_period()
+            if request is None:
+                return
 
-    def __init__(self, process_factory: ProcessFactory) -> None:
-        self._process_factory = process_factory
+            (generation, changed_paths) = request
+            self._run_build(generation, changed_paths)
 
-    def factory(self) -> ProcessFactory:
-        return self._process_factory
+    def shutdown(self) -> None:
+        with self._condition:
+            self._shutdown = True
+            if self._build is not None:
+                self._build.cancel()
+            self._condition.notify_all()
+
+    def _wait_for_quiet_period(self) -> Tuple[int, FrozenSet[str]] | None:
+        with self._condition:
+            while not self._shutdown:
+                if self._requested_generation == self._built_generation:
+                    self._condition.wait()
+                    continue
+
+                remaining = self._deadline - monotonic()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+
+                changed_paths = frozenset(self._changed_paths)
+                self._changed_paths.clear()
+                self._built_generation = self._requested_generation
+                return (self._built_generation, changed_paths)
+
+            return None
+
+    def _run_build(self, generation: int,
+                   changed_paths: FrozenSet[str]) -> None:
+        with self._condition:
+            if self._shutdown or generation != self._requested_generation:
+                # The changes are still unbuilt, so they carry over to the
+                # newer generation.
+                self._changed_paths.update(changed_paths)
+                return
 
+            print(f'building generation {generation}')
+            build = self._build_factory.create(changed_paths)
+            self._build = build
 
-@dataclass
-class BuildProcessRequestQueueOptions:
-    max_queue_size: int
+        succeeded = False
+        try:
+            succeeded = build.wait()
+        finally:
+            with self._condition:
+                self._build = None
+                is_latest = generation == self._requested_generation
+                if not succeeded:
+                    # A failed or cancelled build may have stopped part way
+                    # through its changes, so the next build sees them again.
+                    self._changed_paths.update(changed_paths)
+
+        if not succeeded or not is_latest:
+            print(f'generation {generation} discarded')
+            return
 
+        print(f'generation {generation} complete')
+        self._on_build_success()
 
-class BuildProcessRequestQueue:
 
-    def __init__(
-        self, process_factory: ProcessFactory,
-        build_process_request_queue_options: BuildProcessRequestQueueOptions
-    ) -> None:
-        max_queue_size = build_process_request_queue_options.max_queue_size
+def terminate_process(proc: Popen) -> None:
+    # Builds run make, which starts its own children, e.g., pandoc, so the
+    # whole process group is terminated when the build was started in a
+    # session of its own.
+    if proc.poll() is not None:
+        return
 
-        self._process_factory = process_factory
-        self._queue: Queue[ProcessRequest] = Queue(max_queue_size)
+    try:
+        if getpgid(proc.pid) == proc.pid:
+            killpg(proc.pid, SIGTERM)
+        else:
+            proc.terminate()
+    except ProcessLookupError:
+        pass
+
+
+class ProcessBuild(Build):
+
+    def __init__(self, proc: Popen) -> None:
+        self._proc = proc
+
+    def wait(self) -> bool:
+        return self._proc.wait() == 0
+
+    def cancel(self) -> None:
+        terminate_process(self._proc)
+
+
+def reload_modules(changed_names: Set[str], package: str) -> List[str]:
+    # Modules importing a changed module, directly or not, hold references
+    # into it, so they are reloaded after it, dependencies first. Modules
+    # outside the package reach it through module objects, which reloading
+    # updates in place.
+    loaded = {
+        n: m
+        for (n, m) in list(sys.modules.items())
+        if n.startswith(f'{package}.') and m is not None
+    }
+    imports = {
+        n: {
+            v.__name__
+            for v in vars(m).values()
+            if isinstance(v, ModuleType) and v.__name__ in loaded
+        }
+        for (n, m) in loaded.items()
+    }
+
+    affected = changed_names & loaded.keys()
+    grown = True
+    while grown:
+        dependents = {
+            n
+            for (n, i) in imports.items() if n not in affected and i & affected
+        }
+        affected |= dependents
+        grown = len(dependents) > 0
+
+    order: List[str] = []
+    visiting: Set[str] = set()
+
+    def visit(name: str) -> None:
+        if name in order or name in visiting:
+            return
 
-    def put_create_process(self) -> None:
-        try:
-            self._queue.put(CreateProcessRequest(self._process_factory))
-        except Full as f:
-            print(f)
+        visiting.add(name)
+        for i in sorted(imports[name] & affected):
+            visit(i)
+        order.append(name)
 
-    def put_no_process(self) -> None:
-        try:
-            self._queue.put_nowait(NoProcessRequest())
-        except Full as f:
-            print(f)
+    for n in sorted(affected):
+        visit(n)
 
-    def get(self) -> ProcessRequest:
-        try:
-            return self._queue.get()
-        finally:
-            self._queue.task_done()
+    for n in order:
+        importlib.reload(loaded[n])
+    return order
 
-    def join(self) -> None:
-        self._queue.join()
-        print('test')
+
+@dataclass
+class InProcessBuildOptions:
+    template_location: str
+    template_name: str
+    styling_location: str
+    output_file_name: str
+    section_cache_size: int
+
+
+class Stage(Enum):
+    PROCESS = 'process'
+    RENDER = 'render'
+    HTML = 'html'
+    LAYOUT = 'layout'
+
+
+# Every stage turns the artifact of the stage before it into its own, i.e.,
+# resume data into template data, template data into markdown, markdown into
+# HTML and HTML into a PDF, so a stage that reruns makes the stages after it
+# rerun too.
+_DOWNSTREAM_STAGES: Dict[Stage, Tuple[Stage, ...]] = {
+    Stage.PROCESS: (Stage.RENDER, ),
+    Stage.RENDER: (Stage.HTML, ),
+    Stage.HTML: (Stage.LAYOUT, ),
+    Stage.LAYOUT: ()
+}
+
+
+def get_downstream_stages(stage: Stage) -> Set[Stage]:
+    stages = {stage}
+    for s in _DOWNSTREAM_STAGES[stage]:
+        stages |= get_downstream_stages(s)
+    return stages
+
+
+class InProcessBuilder(BuildFactory):
+
+    # Builds the dev PDF inside the dev server. The process, templates and
+    # parsed stylesheet stay loaded between builds, and so does the artifact
+    # of every stage. A change only reruns the stage it feeds and the stages
+    # after it:
+    #
+    # - data and code, i.e., conversion modules and main.py: process
+    # - templates: render, or process when the fields a template reads or the
+    #   items it shows changed
+    # - styling: layout
+    #
+    # A change to a conversion module reloads that module and the ones
+    # importing it, and a change to main.py reloads main.
+    #
+    # Within the process and render stages, each resume section and the
+    # template block showing it are reused while the section's data is
+    # unchanged, so editing one section only reprocesses and rerenders it.
+    # Every build prints how often both caches were hit.
+    def __init__(self, data_source: str,
+                 in_process_build_options: InProcessBuildOptions) -> None:
+        self._data_source = data_source.strip()
+        self._options = in_process_build_options
+        self._root = path.dirname(path.abspath(__file__))
+
+        self._proc: Any = None
+        self._projection: Any = None
+        self._template: Any = None
+        self._layout: Any = None
+
+        self._artifacts: Dict[Stage, Any] = {}
+        self._stale_stages: Set[Stage] = set(Stage)
+
+    def create(self, changed_paths: FrozenSet[str]) -> Build:
+        return InProcessBuild(self, changed_paths)
+
+    def build(self, changed_paths: FrozenSet[str], cancelled: Event) -> bool:
+        try:
+            self._apply_changes(changed_paths)
+            return self._build(cancelled)
+        except Exception as e:
+            print(f'{type(e).__name__}: {e}')
+            return False
+
+    def _invalidate(self, stage: Stage) -> None:
+        self._stale_stages |= get_downstream_stages(stage)
+
+    def _apply_changes(self, changed_paths: FrozenSet[str]) -> None:
+        options = self._options
+        data_file_name = path.abspath(self._data_source)
+        template_directory = path.abspath(options.template_location)
+        styling_directory = path.dirname(path.abspath(
+            options.styling_location))
+
+        changed_modules = set()
+        main_changed = False
+        for p in changed_paths:
+            absolute_path = path.abspath(p)
+            (stem,
+             extension) = path.splitext(path.relpath(absolute_path,
+                                                     self._root))
+            if absolute_path == data_file_name:
+                self._invalidate(Stage.PROCESS)
+            elif stem == 'main' and extension == '.py':
+                main_changed = True
+            elif stem.startswith(
+                    f'conversion{path.sep}') and extension == '.py':
+                changed_modules.add(stem.replace(path.sep, '.'))
+            elif absolute_path.startswith(template_directory + path.sep):
+                self._apply_template_change()
+            elif absolute_path.startswith(styling_directory + path.sep):
+                self._layout = None
+                self._invalidate(Stage.LAYOUT)
+
+        if len(changed_modules) > 0:
+            for n in reload_modules(changed_modules, 'conversion'):
+                print(f'reloaded {n}')
+            self._proc = None
+            self._invalidate(Stage.PROCESS)
+
+        if main_changed:
+            importlib.reload(generator)
+            print('reloaded main')
+            self._proc = None
+            self._projection = None
+            self._template = None
+            self._invalidate(Stage.PROCESS)
+
+    def _apply_template_change(self) -> None:
+        # Template data only has to be processed again when the template
+        # reads different fields or shows different items.
+        self._template = None
+        self._invalidate(Stage.RENDER)
+        projection = self._get_projection()
+        if projection != self._projection:
+            self._projection = projection
+            self._invalidate(Stage.PROCESS)
+
+    def _get_projection(self) -> Any:
+        options = self._options
+        template_options = generator.TemplateOptions(options.template_location)
+        return generator.get_template_projections(
+            template_options, [options.template_name])[options.template_name]
+
+    def _build(self, cancelled: Event) -> bool:
+        options = self._options
+        template_name = options.template_name
+
+        if self._proc is None:
+            self._proc = generator.configure_and_get_process(
+                section_cache_size=options.section_cache_size)
+        if self._projection is None:
+            self._projection = self._get_projection()
+        if self._template is None:
+            self._template = generator.get_block_memoized_template(
+                generator.TemplateOptions(options.template_location),
+                template_name, options.section_cache_size)
+        if self._layout is None:
+            # WeasyPrint needs native libraries, so it is only imported once
+            # the first build runs.
+            import pdf_layout
+            self._layout = pdf_layout.PdfLayout(options.styling_location)
+
+        def process() -> Any:
+            data = generator.read_in_file(self._data_source)
+            return self._proc.run_with(data, self._projection.section_limits,
+                                       self._projection.field_mask)
+
+        def render() -> Any:
+            return self._template.render(self._artifacts[Stage.PROCESS])
+
+        def to_html() -> Any:
+            return self._layout.to_html(self._artifacts[Stage.RENDER])
+
+        def layout() -> Any:
+            pdf = self._layout.write_html_pdf(self._artifacts[Stage.HTML])
+            # Laying out may take long enough for a newer build to be
+            # requested, and a stale document must not replace the current
+            # one. Builds run one at a time, so a newer build always writes
+            # after this one.
+            if not cancelled.is_set():
+                write_out_atomically(options.output_file_name, pdf)
+            return pdf
+
+        runners: Dict[Stage, Callable[[], Any]] = {
+            Stage.PROCESS: process,
+            Stage.RENDER: render,
+            Stage.HTML: to_html,
+            Stage.LAYOUT: layout
+        }
+
+        # Stages left stale by a cancelled or failed build stay stale, so the
+        # next build picks up where this one stopped.
+        for stage in Stage:
+            if cancelled.is_set():
+                return False
+            if stage not in self._stale_stages:
+                continue
+
+            start = monotonic()
+            artifact = runners[stage]()
+            if cancelled.is_set():
+                return False
+
+            self._artifacts[stage] = artifact
+            self._stale_stages.discard(stage)
+            print(f'{stage.value} took {(monotonic() - start) * 1000:.1f} ms')
+
+        section_stats = self._proc.section_cache_stats()
+        if section_stats is not None:
+            print(get_cache_summary('section cache', section_stats))
+        print(get_cache_summary('block cache', self._template.cache_stats()))
+        return True
+
+
+def get_cache_summary(name: str, stats: Dict[str, int]) -> str:
+    # Hits and misses since the cache was created, i.e., since the process or
+    # template holding it was last set up.
+    return (f'{name}: hits={stats["hits"]} misses={stats["misses"]} '
+            f'size={stats["size"]}/{stats["max_size"]}')
+
+
+class InProcessBuild(Build):
+
+    # In-process builds cannot be interrupted, so a cancelled build stops
+    # after its current stage, keeps that stage stale and never writes its
+    # output.
+    def __init__(self, in_process_builder: InProcessBuilder,
+                 changed_paths: FrozenSet[str]) -> None:
+        self._in_process_builder = in_process_builder
+        self._changed_paths = changed_paths
+        self._cancelled = Event()
+
+    def wait(self) -> bool:
+        return self._in_process_builder.build(self._changed_paths,
+                                              self._cancelled)
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+
+def write_out_atomically(file_name: str, document: bytes) -> None:
+    # The browser may fetch the document at any time, so it never sees a
+    # partially written one.
+    directory = path.dirname(path.abspath(file_name))
+    makedirs(directory, exist_ok=True)
+    (fd, temp_file_name) = mkstemp(dir=directory, suffix='.tmp')
+    with fdopen(fd, 'wb') as file:
+        file.write(document)
+    replace(temp_file_name, file_name)
 
 
 @dataclass
@@ -148,93 +543,20 @@ class ProjectDirObserverDaemon(Daemon):
         self._observer.join()
 
 
-class BuildProcessRequestQueueReader:
-
-    def __init__(self, build_process_request_queue: BuildProcessRequestQueue,
-                 on_process_success: Callback) -> None:
-
-        self._shudown = Event()
-
-        self._process_not_running = Event()
-        self._process_not_running.set()
-
-        self._thread_not_created = Event()
-        self._thread_not_created.set()
-
-        self._build_process_request_queue = build_process_request_queue
-
-        def create_thread_target(process_factory: ProcessFactory) -> Callback:
-
-            def thread_logic() -> None:
-                print('running')
-                self._build_process_request_queue.join()
-                self._process_not_running.clear()
-
-                try:
-                    proc = process_factory.create()
-                    return_code = proc.wait()
-                    if return_code != 0:
-                        return
-
-                    print('build complete')
-                    on_process_success()
-                finally:
-                    self._thread_not_created.set()
-                    self._process_not_running.set()
-
-            return thread_logic
-
-        self._create_thread_target = create_thread_target
-
-    def handle_request(self) -> None:
-        request = self._build_process_request_queue.get()
-        match request:
-            case CreateProcessRequest() as c:
-                if not self._thread_not_created.is_set():
-                    print('skip')
-                    return
-
-                self._process_not_running.wait()
-                self._thread_not_created.clear()
-
-                target = self._create_thread_target(c.factory())
-                Thread(target=target).start()
-            case NoProcessRequest():
-                return
-            case _:
-                raise AssertionError('''
-                    A case for given implementation of ProcessRequest has no
-                    definition in BuildProcessRequestQueueReader.handle_request.
-                    All implementations of ProcessRequest must be handled.
-                ''')
-
-    def serve_forever(self) -> None:
-        self._shudown.clear()
-        while not self._shudown.is_set():
-            self.handle_request()
-
-    def shutdown(self) -> None:
-        self._shudown.set()
-        self._build_process_request_queue.put_no_process()
-
-
-class BuildProcessRequestQueueReaderDaemon(Daemon):
+class RebuildSchedulerDaemon(Daemon):
 
-    def __init__(
-        self,
-        build_process_request_queue_reader: BuildProcessRequestQueueReader
-    ) -> None:
-        self._build_process_request_queue_reader = build_process_request_queue_reader
+    def __init__(self, rebuild_scheduler: RebuildScheduler) -> None:
+        self._rebuild_scheduler = rebuild_scheduler
         self._stop = Event()
 
-        def serve_build_requests():
+        def serve_rebuilds():
             while not self._stop.is_set():
                 try:
-                    self._build_process_request_queue_reader.serve_forever()
+                    self._rebuild_scheduler.serve_forever()
                 except Exception as e:
                     print(e)
 
-        self._thread = Thread(target=serve_build_requests)
+        self._thread = Thread(target=serve_rebuilds)
 
     def start(self) -> None:
         self._thread.start()
@@ -244,7 +566,7 @@ class BuildProcessRequestQueueReaderDaemon(Daemon):
             return
 
         self._stop.set()
-        self._build_process_request_queue_reader.shutdown()
+        self._rebuild_scheduler.shutdown()
 
     def join(self) -> None:
         self._thread.join()
@@ -308,34 +630,190 @@ class DevHTTPServerDaemon(Daemon):
         self._thread.join()
 
 
+class SlowSubscriberPolicy(Enum):
+    # What a full send queue does with a new message:
+    #
+    # - coalesce: drops the new message when the same one is already queued,
+    #   e.g., a second reload, and otherwise the oldest queued message
+    # - disconnect: closes the connection, and the browser has to reconnect
+    COALESCE = 'coalesce'
+    DISCONNECT = 'disconnect'
+
+
+@dataclass
+class WebSocketMessagePublisherOptions:
+    send_queue_size: int
+    slow_subscriber_policy: SlowSubscriberPolicy
+
+
+class WebSocketSubscriber:
+
+    # Sends queued messages to one connection from a thread of its own, so a
+    # slow or half-dead connection only holds up its own messages.
+    def __init__(
+        self, connection: ServerConnection,
+        web_socket_message_publisher_options: WebSocketMessagePublisherOptions
+    ) -> None:
+        self._connection = connection
+        self._send_queue_size = max(
+            web_socket_message_publisher_options.send_queue_size, 1)
+        self._policy = web_socket_message_publisher_options.slow_subscriber_policy
+
+        self._condition = Condition()
+        self._queue: Deque[str] = deque()
+        self._closed = False
+        self._disconnected = False
+        self._sent = 0
+        self._coalesced = 0
+        self._dropped = 0
+        self._thread = Thread(target=self._send_queued, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def offer(self, message: str) -> bool:
+        # Never blocks. Returns False once the subscriber is closed.
+        with self._condition:
+            if self._closed:
+                return False
+
+            if len(self._queue) >= self._send_queue_size:
+                match self._policy:
+                    case SlowSubscriberPolicy.COALESCE if message in self._queue:
+                        self._coalesced += 1
+                        return True
+                    case SlowSubscriberPolicy.COALESCE:
+                        self._queue.popleft()
+                        self._dropped += 1
+                    case SlowSubscriberPolicy.DISCONNECT:
+                        self._dropped += len(self._queue) + 1
+                        self._queue.clear()
+                        self._disconnected = True
+                        self._close()
+                        return False
+
+            self._queue.append(message)
+            self._condition.notify()
+            return True
+
+    def close(self) -> None:
+        with self._condition:
+            self._close()
+
+    def stats(self) -> Dict[str, int]:
+        with self._condition:
+            return {
+                'queue_depth': len(self._queue),
+                'sent': self._sent,
+                'coalesced': self._coalesced,
+                'dropped': self._dropped,
+                'disconnected': 1 if self._disconnected else 0
+            }
+
+    def _close(self) -> None:
+        if self._closed:
+            return
+
+        self._closed = True
+        self._condition.notify()
+        # Closing waits for the closing handshake, which a slow connection
+        # may never complete.
+        Thread(target=self._connection.close, daemon=True).start()
+
+    def _send_queued(self) -> None:
+        while True:
+            with self._condition:
+                while len(self._queue) == 0 and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                message = self._queue.popleft()
+
+            try:
+                self._connection.send(message)
+            except Exception as e:
+                print(f'{type(e).__name__}: {e}')
+                self.close()
+                return
+
+            with self._condition:
+                self._sent += 1
+
+
 class WebSocketMessagePublisher:
 
-    def __init__(self) -> None:
+    # Broadcasting only queues the message for every subscriber, so it never
+    # waits on a connection. The counts of removed subscribers are kept, so
+    # stats cover every subscriber since the server started.
+    def __init__(
+        self,
+        web_socket_message_publisher_options: WebSocketMessagePublisherOptions
+    ) -> None:
+        self._options = web_socket_message_publisher_options
         self._lock = Lock()
-        self._broadcast_event = Event()
-        self._subscribers: Set[ServerConnection] = set()
+        self._subscribers: Dict[ServerConnection, WebSocketSubscriber] = {}
+        self._removed_stats: Counter[str] = Counter()
 
     def add(self, new_sub: ServerConnection) -> None:
+        subscriber = WebSocketSubscriber(new_sub, self._options)
         with self._lock:
             print('new connection')
-            self._subscribers.add(new_sub)
+            self._subscribers[new_sub] = subscriber
+        subscriber.start()
 
     def remove(self, sub: ServerConnection) -> None:
-        with self._lock:
-            print('connection removed')
-            self._subscribers.remove(sub)
+        print('connection removed')
+        self._remove(sub)
 
     def broadcast(self, message: str) -> None:
         with self._lock:
-            self._broadcast_event.set()
-            for s in self._subscribers:
-                s.send(message)
-            self._broadcast_event.clear()
+            subscribers = list(self._subscribers.items())
+
+        for (connection, subscriber) in subscribers:
+            if not subscriber.offer(message):
+                self._remove(connection)
+
+        stats = self.stats()
+        print(f'broadcast to {stats["subscribers"]} subscribers, '
+              f'max queue depth {stats["max_queue_depth"]}, '
+              f'{stats["coalesced"]} coalesced, {stats["dropped"]} dropped, '
+              f'{stats["disconnected"]} disconnected')
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            subscribers = list(self._subscribers.values())
+            totals = Counter(self._removed_stats)
+
+        depths = [0]
+        for s in subscribers:
+            subscriber_stats = s.stats()
+            depths.append(subscriber_stats.pop('queue_depth'))
+            totals.update(subscriber_stats)
+        return {
+            'subscribers': len(subscribers),
+            'max_queue_depth': max(depths),
+            'sent': totals['sent'],
+            'coalesced': totals['coalesced'],
+            'dropped': totals['dropped'],
+            'disconnected': totals['disconnected']
+        }
 
     def close_all(self) -> None:
         with self._lock:
-            for s in self._subscribers:
-                s.close()
+            connections = list(self._subscribers.keys())
+        for c in connections:
+            self._remove(c)
+
+    def _remove(self, connection: ServerConnection) -> None:
+        with self._lock:
+            subscriber = self._subscribers.pop(connection, None)
+            if subscriber is None:
+                return
+
+            subscriber.close()
+            subscriber_stats = subscriber.stats()
+            subscriber_stats.pop('queue_depth')
+            self._removed_stats.update(subscriber_stats)
 
 
 @dataclass
@@ -406,7 +884,7 @@ class DevWebSocketServerDaemon(Daemon):
 
 @dataclass
 class DaemonOptions:
-    build_process_request_queue_options: BuildProcessRequestQueueOptions
+    rebuild_scheduler_options: RebuildSchedulerOptions
     project_dir_observer_daemon_options: ProjectDirObserverDaemonOptions
     dev_http_server_daemon_options: DevHTTPServerDaemonOptions
     dev_web_socket_server_daemon_options: DevWebSocketServerDaemonOptions
@@ -423,11 +901,19 @@ class ProcessConfig:
     stderr: int
 
 
+@dataclass
+class BuildConfig:
+    in_process: bool
+    in_process_build_options: InProcessBuildOptions
+
+
 @dataclass
 class Config:
     daemon_options: DaemonOptions
     process_config: ProcessConfig
+    build_config: BuildConfig
     web_socket_broadcast_messages: WebSocketBroadcastMessages
+    web_socket_message_publisher_options: WebSocketMessagePublisherOptions
 
 
 def read_config(optional_file_name: str | None) -> Config:
@@ -444,16 +930,15 @@ def read_config(optional_file_name: str | None) -> Config:
     d = {} if optional_file_name is None else read_config_file(
         optional_file_name)
 
-    raw_build_process_request_queue_options = coalesce(
-        d.get('build_process_request_queue'), {})
+    raw_rebuild_scheduler_options = coalesce(d.get('rebuild_scheduler'), {})
     raw_project_dir_observer_options = coalesce(d.get('project_dir_observer'),
                                                 {})
     raw_local_web_server = coalesce(d.get('local_web_server'), {})
     daemon_options = DaemonOptions(
-        BuildProcessRequestQueueOptions(
+        RebuildSchedulerOptions(
             coalesce(
-                raw_build_process_request_queue_options.get('max_queue_size'),
-                100)),
+                raw_rebuild_scheduler_options.get('debounce_milliseconds'),
+                100) / 1000),
         ProjectDirObserverDaemonOptions(
             set(
                 coalesce(
@@ -490,8 +975,35 @@ def read_config(optional_file_name: str | None) -> Config:
         coalesce(raw_web_socket_broadcast_messages.get('on_process_success'),
                  'reload'))
 
-    return Config(daemon_options, process_config,
-                  web_socket_broadcast_messages)
+    web_socket_message_publisher_options = WebSocketMessagePublisherOptions(
+        coalesce(raw_local_web_server.get('send_queue_size'), 8),
+        SlowSubscriberPolicy(
+            coalesce(raw_local_web_server.get('slow_subscriber_policy'),
+                     'coalesce').strip().lower()))
+
+    raw_build_config = coalesce(d.get('build'), {})
+    build_config = BuildConfig(
+        coalesce(raw_build_config.get('in_process'), True),
+        InProcessBuildOptions(
+            coalesce(raw_build_config.get('template_location'), './templates'),
+            coalesce(raw_build_config.get('template_name'), 'pdf'),
+            coalesce(raw_build_config.get('styling_location'),
+                     './styling/pdf.css'),
+            coalesce(raw_build_config.get('output_file_name'),
+                     './static/doc/resume_dev.pdf'),
+            coalesce(raw_build_config.get('section_cache_size'), 64)))
+
+    return Config(daemon_options, process_config, build_config,
+                  web_socket_broadcast_messages,
+                  web_socket_message_publisher_options)
+
+
+def is_bytecode_path(file_path: str) -> bool:
+    # Importing and reloading modules writes their bytecode next to them, into
+    # __pycache__. Such writes are no change to the project, and treating them
+    # as one would cancel the very build that reloaded the module.
+    return path.splitext(file_path)[1] == '.pyc' or '__pycache__' in (
+        path.normpath(file_path).split(path.sep))
 
 
 def get_daemons(data_source: str, config: Config) -> Daemon:
@@ -501,26 +1013,37 @@ def get_daemons(data_source: str, config: Config) -> Daemon:
 
     trimmed_data_source = data_source.strip()
 
-    class MakeProcessFactory(ProcessFactory):
-
-        def create(self) -> Popen:
-            return Popen(['make', 'pdf-dev', f'data={trimmed_data_source}'],
-                         stdout=process_config.stdout,
-                         stderr=process_config.stderr)
-
-    make_process_factory = MakeProcessFactory()
-    build_process_request_queue = BuildProcessRequestQueue(
-        make_process_factory,
-        daemon_options.build_process_request_queue_options)
+    class MakeBuildFactory(BuildFactory):
+
+        def create(self, changed_paths: FrozenSet[str]) -> Build:
+            # A session of its own lets a stale build be terminated along
+            # with everything make started.
+            return ProcessBuild(
+                Popen(['make', 'pdf-dev', f'data={trimmed_data_source}'],
+                      stdout=process_config.stdout,
+                      stderr=process_config.stderr,
+                      start_new_session=True))
+
+    build_factory: BuildFactory = MakeBuildFactory()
+    if config.build_config.in_process:
+        build_factory = InProcessBuilder(
+            trimmed_data_source, config.build_config.in_process_build_options)
+    web_socket_message_publisher = WebSocketMessagePublisher(
+        config.web_socket_message_publisher_options)
+
+    rebuild_scheduler = RebuildScheduler(
+        build_factory, daemon_options.rebuild_scheduler_options,
+        lambda: web_socket_message_publisher.broadcast(
+            web_socket_broadcast_messages.on_process_success_message))
 
     class RebuildEventHandler(FileSystemEventHandler):
 
         def on_modified(self, event: FileSystemEvent) -> None:
-            if event.is_directory:
+            if event.is_directory or is_bytecode_path(event.src_path):
                 return
 
             print(event)
-            build_process_request_queue.put_create_process()
+            rebuild_scheduler.request_rebuild(event.src_path)
 
     rebuild_event_handler = RebuildEventHandler()
 
@@ -528,14 +1051,7 @@ def get_daemons(data_source: str, config: Config) -> Daemon:
         rebuild_event_handler,
         daemon_options.project_dir_observer_daemon_options)
 
-    web_socket_message_publisher = WebSocketMessagePublisher()
-
-    build_process_request_queue_reader = BuildProcessRequestQueueReader(
-        build_process_request_queue, lambda: web_socket_message_publisher.
-        broadcast(web_socket_broadcast_messages.on_process_success_message))
-
-    build_process_request_queue_reader_daemon = BuildProcessRequestQueueReaderDaemon(
-        build_process_request_queue_reader)
+    rebuild_scheduler_daemon = RebuildSchedulerDaemon(rebuild_scheduler)
 
     dev_http_server_daemon = DevHTTPServerDaemon(
         daemon_options.dev_http_server_daemon_options)
@@ -544,8 +1060,7 @@ def get_daemons(data_source: str, config: Config) -> Daemon:
         web_socket_message_publisher,
         daemon_options.dev_web_socket_server_daemon_options)
 
-    return Legion(project_dir_observer_daemon,
-                  build_process_request_queue_reader_daemon,
+    return Legion(project_dir_observer_daemon, rebuild_scheduler_daemon,
                   dev_http_server_daemon, dev_web_socket_server_daemon)
 
 
@@ -18,6 +18,7 @@
             pkgs.pyright
             (pkgs.python312.withPackages (pypkgs: [
               pypkgs.jinja2
+              pypkgs.markdown
               pypkgs.watchdog
               pypkgs.weasyprint
               pypkgs.websockets
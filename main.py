@@ -1,11 +1,31 @@
-from typing import Any, Dict
-from conversion import bounded_text, email, location, number, phone_number, process, time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Any, Callable, ContextManager, Dict, FrozenSet, Iterable, Iterator, List, Set, TextIO, Tuple
+from conversion import bounded_text, email, instrumentation, location, memoization, number, phone_number, process, time
 import argparse
+import collections
+import contextlib
+import functools
+import glob
+import hashlib
+import itertools
 import jinja2 as jinja
+from jinja2.bccache import Bucket
 import json
+import math
+import multiprocessing
+import os
+import render_cache
+import sys
+import template_projection
+import threading
+import zipfile
 
 
-def configure_and_get_process() -> process.Process:
+def configure_and_get_config(
+        clock: time.Clock | None = None) -> process.Config:
 
     def configure_and_get_short_bounded_text_limit(
     ) -> bounded_text.BoundedTextLimits:
@@ -22,7 +42,7 @@ def configure_and_get_process() -> process.Process:
         return bounded_text_limits
 
     def configure_and_get_date_parser() -> time.DateParser:
-        date_parser = time.YearMonthParser()
+        date_parser = time.FastYearMonthParser()
 
         return date_parser
 
@@ -33,18 +53,20 @@ def configure_and_get_process() -> process.Process:
 
     def configure_and_get_phone_number_parser(
     ) -> phone_number.PhoneNumberParser:
-        phone_number_sanitizer = phone_number.RegexPhoneNumberParser()
+        phone_number_sanitizer = phone_number.CompactRegexPhoneNumberParser()
 
         return phone_number_sanitizer
 
     def configure_and_get_digits_to_phone_number_converter(
     ) -> phone_number.DigitsToPhoneNumberConverter:
-        phone_number_converter = phone_number.USDigitsToPhoneNumberConverter()
+        phone_number_converter = phone_number.CompactUSDigitsToPhoneNumberConverter(
+        )
 
         return phone_number_converter
 
     def configure_and_get_date_formatter() -> time.DateFormatter:
-        date_formatter = time.FullMonthNameYearFormatter()
+        date_formatter = time.TableFullMonthNameYearFormatter(
+            time.get_full_month_names())
 
         return date_formatter
 
@@ -69,8 +91,11 @@ def configure_and_get_process() -> process.Process:
     def configure_and_get_number_formatter() -> number.NumberFormatter:
         scale = number.Scale.Three
         number_formatting_flags = number.NumberFormattingFlags.GROUPING
-        number_formatter = number.ScaledNumberFormatter(
-            scale, number_formatting_flags)
+        # The locale's conventions are read once here, so formatting never
+        # touches process-wide locale state.
+        number_conventions = number.FromLocale().create()
+        number_formatter = number.TableNumberFormatter(
+            scale, number_formatting_flags, number_conventions)
 
         return number_formatter
 
@@ -79,7 +104,7 @@ def configure_and_get_process() -> process.Process:
         omit_segment_formatter = phone_number.OmitSegmentFormatter()
         trailing_dot_segment_formatter = phone_number.TrailingDotSegmentFormatter(
         )
-        phone_number_formatter = phone_number.OrdinalPhoneNumberFormatter(
+        phone_number_formatter = phone_number.CompiledPhoneNumberFormatter(
             omit_segment_formatter, trailing_dot_segment_formatter,
             trailing_dot_segment_formatter)
 
@@ -107,15 +132,194 @@ def configure_and_get_process() -> process.Process:
                                     location_formatter, number_formatter,
                                     phone_number_formatter)
 
-    config = process.Config(limits, parsers, converters, formatters)
-    return process.Process(config)
+    set_clock = clock if clock is not None else time.SystemClock()
+    config = process.Config(limits, parsers, converters, formatters, set_clock)
+    return config
 
 
-def get_template(location: str, name: str) -> jinja.Template:
-    loader = jinja.FileSystemLoader(location.strip())
-    env = jinja.Environment(loader=loader)
-    template = env.get_template(f'{name.strip()}.md.jinja')
-    return template
+def configure_and_get_process(clock: time.Clock | None = None,
+                              timings: instrumentation.Timings | None = None,
+                              memoization_max_size: int = 0,
+                              section_cache_size: int = 0) -> process.Process:
+    config = configure_and_get_config(clock)
+    if memoization_max_size > 0:
+        config = process.get_memoized_config(config, memoization_max_size,
+                                             timings)
+
+    return process.Process(config, timings, section_cache_size)
+
+
+class ContentHashBytecodeCache(jinja.FileSystemBytecodeCache):
+
+    # Jinja keys cached bytecode on the template file name and only uses the
+    # source checksum to reject stale entries. Keying on the source as well
+    # lets edited and unedited copies of a template coexist in the cache.
+    def get_bucket(self, environment: jinja.Environment, name: str,
+                   filename: str | None, source: str) -> Bucket:
+        checksum = self.get_source_checksum(source)
+        key = hashlib.sha1(f'{name}|{checksum}'.encode('utf-8')).hexdigest()
+        bucket = Bucket(environment, key, checksum)
+        self.load_bytecode(bucket)
+        return bucket
+
+
+@dataclass(frozen=True)
+class TemplateOptions:
+    location: str
+    bytecode_cache_location: str | None = None
+    bundle_location: str | None = None
+
+
+def get_environment(options: TemplateOptions) -> jinja.Environment:
+    if options.bundle_location is not None:
+        # Bundles hold templates already compiled to Python modules, so
+        # loading them skips lexing, parsing and code generation entirely.
+        loader = jinja.ModuleLoader(options.bundle_location.strip())
+    else:
+        loader = jinja.FileSystemLoader(options.location.strip())
+
+    bytecode_cache = None
+    if options.bytecode_cache_location is not None:
+        bytecode_cache_location = options.bytecode_cache_location.strip()
+        os.makedirs(bytecode_cache_location, exist_ok=True)
+        bytecode_cache = ContentHashBytecodeCache(bytecode_cache_location)
+
+    env = jinja.Environment(loader=loader, bytecode_cache=bytecode_cache)
+    return env
+
+
+def get_template_file_name(name: str) -> str:
+    return f'{name.strip()}.md.jinja'
+
+
+def get_template_names(options: TemplateOptions) -> List[str]:
+    # Compiled bundles cannot be listed, so names always come from the
+    # template sources.
+    loader = jinja.FileSystemLoader(options.location.strip())
+    suffix = get_template_file_name('')
+    return [
+        n[:-len(suffix)] for n in loader.list_templates() if n.endswith(suffix)
+    ]
+
+
+def get_templates(options: TemplateOptions) -> Dict[str, jinja.Template]:
+    env = get_environment(options)
+    return {
+        n: env.get_template(get_template_file_name(n))
+        for n in get_template_names(options)
+    }
+
+
+def get_templates_by_name(options: TemplateOptions,
+                          names: List[str]) -> Dict[str, jinja.Template]:
+    env = get_environment(options)
+    return {
+        n.strip(): env.get_template(get_template_file_name(n))
+        for n in names
+    }
+
+
+_FIELD_MASKS_FILE_NAME = 'field_masks.json'
+_SECTION_LIMITS_FILE_NAME = 'section_limits.json'
+
+
+def get_template_projections(
+        options: TemplateOptions, names: Iterable[str]
+) -> Dict[str, template_projection.TemplateProjection]:
+    # The fields each template reads and the items it shows are found from
+    # template sources, except with a bundle, where they were found when the
+    # bundle was compiled.
+    if options.bundle_location is not None:
+        masks = read_bundle_file(options.bundle_location,
+                                 _FIELD_MASKS_FILE_NAME)
+        limits = read_bundle_file(options.bundle_location,
+                                  _SECTION_LIMITS_FILE_NAME)
+        return {
+            n.strip():
+            template_projection.TemplateProjection(
+                template_projection.from_json(masks[n.strip()])
+                if n.strip() in masks else process.FieldMask(),
+                template_projection.section_limits_from_json(limits[n.strip()])
+                if n.strip() in limits else process.SectionLimits())
+            for n in names
+        }
+
+    env = jinja.Environment()
+    return {
+        n.strip():
+        template_projection.get_projection(env,
+                                           get_template_source(options, n))
+        for n in names
+    }
+
+
+def get_field_mask(masks: Iterable[process.FieldMask]) -> process.FieldMask:
+    # Templates rendered from the same template data need every field any of
+    # them reads.
+    return functools.reduce(process.FieldMask.union, masks,
+                            process.FieldMask(frozenset()))
+
+
+def get_section_limits(
+        limits: Iterable[process.SectionLimits]) -> process.SectionLimits:
+    # Templates rendered from the same template data need every item any of
+    # them shows.
+    listed = list(limits)
+    if len(listed) == 0:
+        return process.SectionLimits()
+
+    return functools.reduce(process.SectionLimits.union, listed)
+
+
+def read_bundle_file(bundle_location: str, file_name: str) -> Dict[str, Any]:
+    # Bundles compiled before field masks or section limits existed have
+    # none, and every template in them reads every field and shows every
+    # item.
+    trimmed = bundle_location.strip()
+    try:
+        if os.path.isdir(trimmed):
+            with open(os.path.join(trimmed, file_name), 'rb') as file:
+                return json.loads(file.read())
+        with zipfile.ZipFile(trimmed) as bundle:
+            return json.loads(bundle.read(file_name))
+    except (FileNotFoundError, KeyError):
+        return {}
+
+
+def compile_template_bundle(options: TemplateOptions,
+                            bundle_location: str) -> None:
+    env = get_environment(options)
+    trimmed = bundle_location.strip()
+    zip = 'deflated' if trimmed.endswith('.zip') else None
+    env.compile_templates(trimmed, zip=zip, ignore_errors=False)
+
+    # Field masks and section limits are stored next to the compiled
+    # templates, so loading a bundle does not need the template sources to be
+    # parsed.
+    projections = get_template_projections(options,
+                                           get_template_names(options))
+    sidecars = {
+        _FIELD_MASKS_FILE_NAME:
+        json.dumps({
+            n: template_projection.to_json(p.field_mask)
+            for (n, p) in projections.items()
+        }),
+        _SECTION_LIMITS_FILE_NAME:
+        json.dumps({
+            n:
+            template_projection.section_limits_to_json(p.section_limits)
+            for (n, p) in projections.items()
+        })
+    }
+    if zip is None:
+        for (file_name, sidecar) in sidecars.items():
+            with open(os.path.join(trimmed, file_name), 'w') as file:
+                file.write(sidecar)
+    else:
+        with zipfile.ZipFile(trimmed, 'a',
+                             compression=zipfile.ZIP_DEFLATED) as bundle:
+            for (file_name, sidecar) in sidecars.items():
+                bundle.writestr(file_name, sidecar)
 
 
 def read_in_file(file_name: str) -> Dict[str, Any]:
@@ -123,11 +327,616 @@ def read_in_file(file_name: str) -> Dict[str, Any]:
         return json.load(file)
 
 
-def write_out_file(file_name: str, document: str) -> None:
-    with open(file_name.strip(), 'w') as file:
+def write_out_file(file_name: str, document: str | bytes) -> None:
+    mode = 'wb' if isinstance(document, bytes) else 'w'
+    with open(file_name.strip(), mode) as file:
         file.write(document)
 
 
+def render(
+    proc: process.Process,
+    template: jinja.Template,
+    data: Dict[str, Any],
+    limits: process.SectionLimits = process.SectionLimits(),
+    mask: process.FieldMask = process.FieldMask()
+) -> str:
+    template_data = proc.run_with(data, limits, mask)
+    return template.render(template_data)
+
+
+def render_many(
+    proc: process.Process,
+    templates: Dict[str, jinja.Template],
+    data: Dict[str, Any],
+    timings: instrumentation.Timings | None = None,
+    mask: process.FieldMask = process.FieldMask(),
+    limits: process.SectionLimits = process.SectionLimits()
+) -> Dict[str, str]:
+    # The resume is processed once and every template renders from the same
+    # template data.
+    template_data = proc.run_with(data, limits, mask)
+    if timings is None:
+        return {n: t.render(template_data) for (n, t) in templates.items()}
+
+    documents = {}
+    for (n, t) in templates.items():
+        with timings.measure(f'render.{n}'):
+            documents[n] = t.render(template_data)
+    return documents
+
+
+class BlockMemoizedTemplate:
+
+    # Renders a template whose top-level blocks each read whole template data
+    # sections, reusing the output of a block while the sections it reads are
+    # unchanged, and splicing it into the rest of the document. Blocks that
+    # read anything else render every time.
+    def __init__(self, template: jinja.Template,
+                 block_sections: Dict[str, FrozenSet[str]], max_size: int):
+        self.__template = template
+        self.__block_sections = {
+            n: sorted(s)
+            for (n, s) in block_sections.items() if n in template.blocks
+        }
+        self.__cache = memoization.LruCache(max_size)
+        self.__last_blocks: Dict[str, Tuple[Tuple[Any, ...], str]] = {}
+        self.__last_block_hits = 0
+
+    def render(self, template_data: Dict[str, Any]) -> str:
+        context = self.__template.new_context(template_data)
+        for (name, sections) in self.__block_sections.items():
+            values = tuple(template_data.get(s) for s in sections)
+            block = self.__get_block(name, values, context)
+            context.blocks[name] = [functools.partial(yield_block, block)]
+        return ''.join(self.__template.root_render_func(context))
+
+    def __get_block(self, name: str, values: Tuple[Any, ...],
+                    context: Any) -> str:
+        # A process with a section cache passes the very same objects for
+        # unchanged sections, so those are not hashed again.
+        last = self.__last_blocks.get(name)
+        if last is not None and all(a is b for (a, b) in zip(last[0], values)):
+            self.__last_block_hits += 1
+            return last[1]
+
+        key = (name, ) + tuple(process.get_subtree_hash(v) for v in values)
+        (found, block) = self.__cache.get(key)
+        if not found:
+            block = ''.join(self.__template.blocks[name](context))
+            self.__cache.put(key, block)
+        self.__last_blocks[name] = (values, block)
+        return block
+
+    def cache_stats(self) -> Dict[str, int]:
+        # Blocks reused because their sections are the very same objects count
+        # as hits too.
+        stats = self.__cache.stats()
+        stats['hits'] += self.__last_block_hits
+        return stats
+
+
+def yield_block(block: str, _: Any) -> Iterator[str]:
+    yield block
+
+
+def get_block_memoized_template(options: TemplateOptions, name: str,
+                                max_size: int) -> BlockMemoizedTemplate:
+    env = get_environment(options)
+    template = env.get_template(get_template_file_name(name))
+    block_sections = template_projection.get_block_sections(
+        env, get_template_source(options, name))
+    return BlockMemoizedTemplate(template, block_sections, max_size)
+
+
+@dataclass(frozen=True)
+class PipelineOptions:
+    template_options: TemplateOptions
+    template_names: Tuple[str, ...]
+    present: datetime
+    styling_location: str | None = None
+    render_cache_options: render_cache.RenderCacheOptions | None = None
+    pdf: bool = False
+    timings: bool = False
+    memoization_max_size: int = 0
+
+
+def get_template_source(options: TemplateOptions, name: str) -> str:
+    loader = jinja.FileSystemLoader(options.location.strip())
+    env = jinja.Environment(loader=loader)
+    (source, _, _) = loader.get_source(env, get_template_file_name(name))
+    return source
+
+
+def get_styling_source(styling_location: str | None) -> bytes | None:
+    if styling_location is None or not os.path.exists(
+            styling_location.strip()):
+        return None
+
+    with open(styling_location.strip(), 'rb') as file:
+        return file.read()
+
+
+class Pipeline:
+
+    def __init__(self, options: PipelineOptions):
+        # Every document rendered by a pipeline sees the same "present", so
+        # documents rendered and cached in one run agree with each other.
+        clock = time.SnapshotClock(options.present)
+        self.__timings = instrumentation.Timings() if options.timings else None
+        self.__proc = configure_and_get_process(clock, self.__timings,
+                                                options.memoization_max_size)
+        self.__templates = get_templates_by_name(options.template_options,
+                                                 list(options.template_names))
+        self.__projections = get_template_projections(options.template_options,
+                                                      self.__templates.keys())
+        self.__pdf = options.pdf
+        self.__styling_location = options.styling_location
+        self.__pdf_layouts = threading.local()
+
+        self.__cache = None
+        self.__template_fingerprints: Dict[str, str] = {}
+        if options.render_cache_options is not None:
+            self.__cache = render_cache.RenderCache(
+                options.render_cache_options)
+
+            code_version = render_cache.get_code_version()
+            styling_source = get_styling_source(options.styling_location)
+            self.__template_fingerprints = {
+                n:
+                render_cache.get_fingerprint(
+                    code_version, n,
+                    get_template_source(options.template_options, n),
+                    styling_source)
+                for n in self.__templates.keys()
+            }
+
+    def run(self, data: Dict[str, Any]) -> Dict[str, str]:
+        if self.__cache is None:
+            return self.__render_many(self.__templates, data)
+
+        keys = self.__get_cache_keys(data)
+
+        documents: Dict[str, str] = {}
+        for (n, k) in keys.items():
+            cached = self.__cache.get(k)
+            if cached is not None:
+                documents[n] = cached.decode('utf-8')
+
+        # The resume is only processed when at least one template missed.
+        missing = {
+            n: t
+            for (n, t) in self.__templates.items() if n not in documents
+        }
+        if len(missing) > 0:
+            rendered = self.__render_many(missing, data)
+            for (n, d) in rendered.items():
+                self.__cache.put(keys[n], d.encode('utf-8'))
+            documents.update(rendered)
+
+        return {n: documents[n] for n in self.__templates.keys()}
+
+    def run_pdf(self, data: Dict[str, Any]) -> Dict[str, bytes]:
+        layout = self.__get_pdf_layout()
+        if self.__cache is None:
+            documents = self.run(data)
+            return {
+                n: self.__write_pdf(layout, n, d)
+                for (n, d) in documents.items()
+            }
+
+        keys = {
+            n: render_cache.get_fingerprint(k, 'pdf')
+            for (n, k) in self.__get_cache_keys(data).items()
+        }
+        pdfs: Dict[str, bytes] = {}
+        for (n, k) in keys.items():
+            cached = self.__cache.get(k)
+            if cached is not None:
+                pdfs[n] = cached
+
+        if len(pdfs) < len(keys):
+            documents = self.run(data)
+            for (n, d) in documents.items():
+                if n not in pdfs:
+                    pdfs[n] = self.__write_pdf(layout, n, d)
+                    self.__cache.put(keys[n], pdfs[n])
+
+        return {n: pdfs[n] for n in self.__templates.keys()}
+
+    def run_output(self, data: Dict[str, Any]) -> Dict[str, str | bytes]:
+        if self.__pdf:
+            return {**self.run_pdf(data)}
+        return {**self.run(data)}
+
+    def measure(self, stage: str) -> ContextManager[None]:
+        if self.__timings is None:
+            return contextlib.nullcontext()
+        return self.__timings.measure(stage)
+
+    def take_timings(self) -> Dict[str, Dict[str, Any]] | None:
+        return None if self.__timings is None else self.__timings.take()
+
+    def __render_many(self, templates: Dict[str, jinja.Template],
+                      data: Dict[str, Any]) -> Dict[str, str]:
+        projections = [self.__projections[n] for n in templates.keys()]
+        return render_many(
+            self.__proc, templates, data, self.__timings,
+            get_field_mask(p.field_mask for p in projections),
+            get_section_limits(p.section_limits for p in projections))
+
+    def __write_pdf(self, layout: Any, name: str, document: str) -> bytes:
+        with self.measure(f'layout.{name}'):
+            return layout.write_pdf(document)
+
+    def __get_cache_keys(self, data: Dict[str, Any]) -> Dict[str, str]:
+        data_hash = render_cache.get_data_hash(data)
+        return {
+            n: render_cache.get_fingerprint(data_hash, f)
+            for (n, f) in self.__template_fingerprints.items()
+        }
+
+    def __get_pdf_layout(self) -> Any:
+        # Layouts hold a Markdown converter and WeasyPrint font configuration,
+        # neither of which can be shared between threads, so each thread
+        # rendering PDFs gets its own.
+        layout = getattr(self.__pdf_layouts, 'layout', None)
+        if layout is None:
+            # WeasyPrint needs native libraries, so it is only imported once a
+            # PDF is actually requested.
+            import pdf_layout
+            layout = pdf_layout.PdfLayout(self.__styling_location)
+            self.__pdf_layouts.layout = layout
+        return layout
+
+
+def get_batch_input_file_names(batch_source: str) -> List[str]:
+    trimmed = batch_source.strip()
+
+    if os.path.isdir(trimmed):
+        return sorted(glob.glob(os.path.join(trimmed, '*.json')))
+
+    is_glob_pattern = any(c in trimmed for c in '*?[')
+    if is_glob_pattern:
+        return sorted(glob.glob(trimmed, recursive=True))
+
+    # Anything else is a manifest: one input file name per line, relative to
+    # the manifest itself. Blank lines and lines starting with "#" are skipped.
+    manifest_dir = os.path.dirname(trimmed)
+    with open(trimmed, 'r') as manifest:
+        lines = [l.strip() for l in manifest]
+        return [
+            os.path.join(manifest_dir, l) for l in lines
+            if l != '' and not l.startswith('#')
+        ]
+
+
+def get_batch_input_root(batch_source: str) -> str:
+    # The directory input file names are mirrored from in the output
+    # directory: a batch directory itself, the part of a glob pattern before
+    # its first wildcard, or a manifest's directory.
+    trimmed = batch_source.strip()
+    if os.path.isdir(trimmed):
+        return trimmed
+
+    if any(c in trimmed for c in '*?['):
+        parts = trimmed.split(os.sep)
+        literal_parts = list(
+            itertools.takewhile(lambda p: not any(c in p for c in '*?['),
+                                parts))
+        return os.sep.join(literal_parts) or os.curdir
+
+    return os.path.dirname(trimmed) or os.curdir
+
+
+def get_batch_output_file_names(output_dir: str,
+                                input_file_name: str,
+                                template_names: List[str],
+                                extension: str = 'md',
+                                input_root: str = '') -> Tuple[str, ...]:
+    # Inputs under the input root keep their place below it, so "a/x.json"
+    # and "b/x.json" do not overwrite each other. Inputs outside it, e.g.,
+    # manifest entries starting with "..", are only named by their base name.
+    relative_name = os.path.relpath(input_file_name.strip(),
+                                    input_root.strip() or os.curdir)
+    if relative_name.split(os.sep)[0] == os.pardir:
+        relative_name = os.path.basename(input_file_name.strip())
+    (stem, _) = os.path.splitext(relative_name)
+
+    # A single template keeps the plain "a.md" name. Several templates are
+    # told apart by name, i.e., "a.markdown.md" and "a.pdf.md".
+    if len(template_names) == 1:
+        return (os.path.join(output_dir.strip(), f'{stem}.{extension}'), )
+
+    return tuple(
+        os.path.join(output_dir.strip(), f'{stem}.{n.strip()}.{extension}')
+        for n in template_names)
+
+
+def get_duplicate_output_file_names(
+        file_names: List[Tuple[str, Tuple[str, ...]]]) -> Dict[str, List[str]]:
+    # Output file names written by more than one input, and those inputs.
+    inputs_by_output: Dict[str, List[str]] = collections.defaultdict(list)
+    for (input_file_name, output_file_names) in file_names:
+        for o in output_file_names:
+            inputs_by_output[os.path.normpath(o)].append(input_file_name)
+    return {o: i for (o, i) in inputs_by_output.items() if len(i) > 1}
+
+
+@dataclass(frozen=True)
+class BatchRecordResult:
+    input_file_name: str
+    output_file_names: Tuple[str, ...]
+    error: str | None = None
+    timings: Dict[str, Dict[str, Any]] | None = None
+
+
+def render_batch_record(
+        pipeline: Pipeline, input_file_name: str,
+        output_file_names: Tuple[str, ...]) -> BatchRecordResult:
+    # Timings are taken per record so that records rendered by pool workers
+    # can be aggregated by the parent process.
+    try:
+        with pipeline.measure('load'):
+            data = read_in_file(input_file_name)
+        documents = pipeline.run_output(data)
+        with pipeline.measure('write'):
+            for (output_file_name, document) in zip(output_file_names,
+                                                    documents.values()):
+                write_out_file(output_file_name, document)
+    except Exception as e:
+        return BatchRecordResult(input_file_name, output_file_names,
+                                 f'{type(e).__name__}: {e}',
+                                 pipeline.take_timings())
+
+    return BatchRecordResult(input_file_name, output_file_names, None,
+                             pipeline.take_timings())
+
+
+# Each pool worker builds its own pipeline exactly once, in init_worker, and
+# reuses it for every record it is handed.
+_worker_pipeline: Pipeline | None = None
+
+
+def init_worker(options: PipelineOptions) -> None:
+    global _worker_pipeline
+    _worker_pipeline = Pipeline(options)
+
+
+def get_worker_pipeline() -> Pipeline:
+    assert _worker_pipeline is not None, \
+        'Pool workers must be initialized with init_worker'
+
+    return _worker_pipeline
+
+
+def render_batch_record_in_worker(
+        file_names: Tuple[str, Tuple[str, ...]]) -> BatchRecordResult:
+    (input_file_name, output_file_names) = file_names
+    return render_batch_record(get_worker_pipeline(), input_file_name,
+                               output_file_names)
+
+
+def get_default_chunk_size(record_count: int, jobs: int) -> int:
+    # Same heuristic as multiprocessing.Pool.map: about four chunks per worker
+    # keeps the workers busy without paying for a round trip per record.
+    return max(1, math.ceil(record_count / (jobs * 4)))
+
+
+def map_in_threads(fn: Callable[[Any], Any], items: Iterable[Any], jobs: int,
+                   ordered: bool) -> Iterator[Any]:
+    # Only a few items per thread are in flight at once, so unbounded streams
+    # are not drained up front.
+    max_pending = jobs * 4
+    with ThreadPoolExecutor(jobs) as executor:
+        if ordered:
+            queued: collections.deque[Future] = collections.deque()
+            for i in items:
+                queued.append(executor.submit(fn, i))
+                if len(queued) >= max_pending:
+                    yield queued.popleft().result()
+            while len(queued) > 0:
+                yield queued.popleft().result()
+            return
+
+        pending: Set[Future] = set()
+        for i in items:
+            pending.add(executor.submit(fn, i))
+            if len(pending) >= max_pending:
+                (done, pending) = wait(pending, return_when=FIRST_COMPLETED)
+                yield from (f.result() for f in done)
+        for f in list(pending):
+            yield f.result()
+
+
+def render_batch(options: PipelineOptions,
+                 file_names: List[Tuple[str, Tuple[str, ...]]],
+                 jobs: int = 1,
+                 chunk_size: int | None = None,
+                 ordered: bool = True,
+                 threads: bool = False) -> Iterator[BatchRecordResult]:
+    if jobs <= 1:
+        pipeline = Pipeline(options)
+        for (input_file_name, output_file_names) in file_names:
+            yield render_batch_record(pipeline, input_file_name,
+                                      output_file_names)
+        return
+
+    if threads:
+        # Threads share one pipeline, so nothing is pickled and templates are
+        # loaded once.
+        shared_pipeline = Pipeline(options)
+        yield from map_in_threads(
+            lambda names: render_batch_record(shared_pipeline, *names),
+            file_names, jobs, ordered)
+        return
+
+    # Only file names cross the process boundary. Records are read, rendered
+    # and written inside the workers.
+    set_chunk_size = chunk_size if chunk_size is not None else get_default_chunk_size(
+        len(file_names), jobs)
+    with multiprocessing.Pool(jobs,
+                              initializer=init_worker,
+                              initargs=(options, )) as pool:
+        imap = pool.imap if ordered else pool.imap_unordered
+        yield from imap(render_batch_record_in_worker, file_names,
+                        set_chunk_size)
+
+
+@dataclass(frozen=True)
+class StreamRecordResult:
+    record_id: Any
+    output_line: str
+    error: str | None = None
+    timings: Dict[str, Dict[str, Any]] | None = None
+
+
+def render_stream_record(pipeline: Pipeline, line_number: int,
+                         line: str) -> StreamRecordResult:
+    # Records without an "id" field are identified by their line number.
+    record_id: Any = line_number
+    try:
+        with pipeline.measure('load'):
+            data = json.loads(line)
+        if isinstance(data, dict):
+            record_id = data.get('id', line_number)
+        documents = pipeline.run(data)
+    except Exception as e:
+        error = f'{type(e).__name__}: {e}'
+        output_line = json.dumps({'id': record_id, 'error': error})
+        return StreamRecordResult(record_id, output_line, error,
+                                  pipeline.take_timings())
+
+    # A single template keeps the {id, document} shape. Several templates are
+    # emitted as {id, documents} keyed by template name.
+    if len(documents) == 1:
+        (document, ) = documents.values()
+        output_line = json.dumps({'id': record_id, 'document': document})
+    else:
+        output_line = json.dumps({'id': record_id, 'documents': documents})
+    return StreamRecordResult(record_id, output_line, None,
+                              pipeline.take_timings())
+
+
+def render_stream_record_in_worker(
+        numbered_line: Tuple[int, str]) -> StreamRecordResult:
+    (line_number, line) = numbered_line
+    return render_stream_record(get_worker_pipeline(), line_number, line)
+
+
+def get_numbered_lines(input: TextIO) -> Iterator[Tuple[int, str]]:
+    for (line_number, line) in enumerate(input, start=1):
+        if line.strip() != '':
+            yield (line_number, line)
+
+
+def render_stream(options: PipelineOptions,
+                  input: TextIO,
+                  jobs: int = 1,
+                  chunk_size: int | None = None,
+                  ordered: bool = True,
+                  threads: bool = False) -> Iterator[StreamRecordResult]:
+    numbered_lines = get_numbered_lines(input)
+
+    if jobs <= 1:
+        pipeline = Pipeline(options)
+        for (line_number, line) in numbered_lines:
+            yield render_stream_record(pipeline, line_number, line)
+        return
+
+    if threads:
+        shared_pipeline = Pipeline(options)
+        yield from map_in_threads(
+            lambda numbered: render_stream_record(shared_pipeline, *numbered),
+            numbered_lines, jobs, ordered)
+        return
+
+    # Pool.imap drains its whole input up front, so lines are fed to the pool
+    # one bounded window at a time to keep memory flat on unbounded streams.
+    set_chunk_size = chunk_size if chunk_size is not None else 64
+    window_size = jobs * set_chunk_size * 4
+    with multiprocessing.Pool(jobs,
+                              initializer=init_worker,
+                              initargs=(options, )) as pool:
+        imap = pool.imap if ordered else pool.imap_unordered
+        while True:
+            window = list(itertools.islice(numbered_lines, window_size))
+            if len(window) == 0:
+                return
+
+            yield from imap(render_stream_record_in_worker, window,
+                            set_chunk_size)
+
+
+@contextlib.contextmanager
+def open_stream(file_name: str, mode: str) -> Iterator[TextIO]:
+    trimmed = file_name.strip()
+    if trimmed == '-':
+        yield sys.stdin if mode == 'r' else sys.stdout
+        return
+
+    with open(trimmed, mode) as file:
+        yield file
+
+
+def write_out_timings(file_name: str, wall_seconds: float, records: int,
+                      timings: instrumentation.Timings) -> None:
+    report = {
+        'wall_seconds': wall_seconds,
+        'records': records,
+        'stages': timings.to_dict()
+    }
+    with open_stream(file_name, 'w') as file:
+        json.dump(report, file, indent=2)
+        file.write('\n')
+
+
+def report_batch_results(results: Iterable[BatchRecordResult],
+                         timings: instrumentation.Timings) -> int:
+    total = 0
+    failure_count = 0
+    for r in results:
+        total += 1
+        if r.timings is not None:
+            timings.merge(r.timings)
+        if r.error is not None:
+            failure_count += 1
+            print(f'{r.input_file_name}: {r.error}', file=sys.stderr)
+
+    succeeded = total - failure_count
+    print(f'Rendered {succeeded} of {total} documents', file=sys.stderr)
+
+    return failure_count
+
+
+def validate_batch(input_file_names: List[str]) -> int:
+    # Every record is loaded up front and its phone number, email and date
+    # columns are checked in bulk, so a batch with invalid records fails before
+    # any document is rendered.
+    records: List[Any] = []
+    loaded_file_names: List[str] = []
+    failure_count = 0
+    for input_file_name in input_file_names:
+        try:
+            records.append(read_in_file(input_file_name))
+            loaded_file_names.append(input_file_name)
+        except Exception as e:
+            failure_count += 1
+            print(f'{input_file_name}: {type(e).__name__}: {e}',
+                  file=sys.stderr)
+
+    validation = process.ColumnValidation(configure_and_get_config())
+    errors = validation.get_errors(records)
+    for (i, record_errors) in sorted(errors.items()):
+        failure_count += 1
+        for e in record_errors:
+            print(f'{loaded_file_names[i]}: {e}', file=sys.stderr)
+
+    valid_count = len(input_file_names) - failure_count
+    print(f'{valid_count} of {len(input_file_names)} records are valid',
+          file=sys.stderr)
+    return failure_count
+
+
 def get_arg_parser() -> argparse.ArgumentParser:
     prog = "Resume Generator"
     description = "A data-driven program that generates resumes using templates."
@@ -136,11 +945,13 @@ def get_arg_parser() -> argparse.ArgumentParser:
     template_name_help = '''
     The name of the template to use. Corresponds to the name of the file in the
     default or given templates directory without extensions, i.e., "pdf" in
-    reference to "pdf.md.jinja".
+    reference to "pdf.md.jinja". Several templates can be given to render each
+    of them from a single processing of the input.
     '''
-    parser.add_argument('template_name',
+    parser.add_argument('template_names',
                         metavar='TEMPLATE_NAME',
                         type=str,
+                        nargs='+',
                         help=template_name_help)
 
     template_location_help = '''
@@ -154,41 +965,352 @@ def get_arg_parser() -> argparse.ArgumentParser:
                         default='templates',
                         help=template_location_help)
 
+    bytecode_cache_help = '''
+    A directory to cache compiled template bytecode in, keyed on the template
+    name and source. Later runs and pool workers load the bytecode instead of
+    compiling the template again.
+    '''
+    parser.add_argument('--bytecode-cache',
+                        dest='bytecode_cache_location',
+                        type=str,
+                        required=False,
+                        help=bytecode_cache_help)
+
+    template_bundle_help = '''
+    A directory or zip file of precompiled templates, as written by
+    compile_templates.py, to load templates from instead of their sources.
+    '''
+    parser.add_argument('--template-bundle',
+                        dest='template_bundle_location',
+                        type=str,
+                        required=False,
+                        help=template_bundle_help)
+
+    input_group = parser.add_mutually_exclusive_group(required=True)
+
     input_file_name_help = '''
     The name of the file containing the data to apply to the given template.
     '''
-    parser.add_argument('-i',
-                        '--input',
-                        dest='input_file_name',
-                        type=str,
-                        required=True,
-                        help=input_file_name_help)
+    input_group.add_argument('-i',
+                             '--input',
+                             dest='input_file_name',
+                             type=str,
+                             help=input_file_name_help)
+
+    batch_source_help = '''
+    Render many documents in one process. Accepts a directory of JSON files, a
+    glob pattern, e.g., "data/**/*.json", or a manifest file listing one input
+    file per line. Requires an output directory.
+    '''
+    input_group.add_argument('-b',
+                             '--batch',
+                             dest='batch_source',
+                             type=str,
+                             help=batch_source_help)
+
+    output_group = parser.add_mutually_exclusive_group(required=True)
 
     output_file_name_help = '''
-    The name of the file to write the document contents to.
+    The name of the file to write the document contents to. Give it once per
+    template, in the same order as the template names.
+    '''
+    output_group.add_argument('-o',
+                              '--output',
+                              dest='output_file_names',
+                              type=str,
+                              action='append',
+                              help=output_file_name_help)
+
+    output_dir_help = '''
+    The directory to write batch documents to. Each document is named after its
+    input file, i.e., "data/a.json" is written to "OUTPUT_DIR/a.md", or to
+    "OUTPUT_DIR/a.TEMPLATE_NAME.md" when several templates are given. Input
+    files in subdirectories of the batch directory, glob pattern or manifest
+    are written to the same subdirectories, e.g., "data/**/*.json" writes
+    "data/b/a.json" to "OUTPUT_DIR/b/a.md".
+    '''
+    output_group.add_argument('-d',
+                              '--output-dir',
+                              dest='output_dir',
+                              type=str,
+                              help=output_dir_help)
+
+    jobs_help = '''
+    The number of worker processes to render a batch with. Defaults to 1, which
+    renders in the current process.
+    '''
+    parser.add_argument('-j',
+                        '--jobs',
+                        dest='jobs',
+                        type=int,
+                        required=False,
+                        default=1,
+                        help=jobs_help)
+
+    chunk_size_help = '''
+    The number of batch records handed to a worker at a time. Defaults to about
+    four chunks per worker.
+    '''
+    parser.add_argument('--chunk-size',
+                        dest='chunk_size',
+                        type=int,
+                        required=False,
+                        default=None,
+                        help=chunk_size_help)
+
+    unordered_help = '''
+    Report batch results as they finish instead of in input order.
     '''
-    parser.add_argument('-o',
-                        '--output',
-                        dest='output_file_name',
+    parser.add_argument('--unordered',
+                        dest='ordered',
+                        action='store_false',
+                        help=unordered_help)
+
+    threads_help = '''
+    Run the -j/--jobs workers as threads of this process sharing one pipeline
+    instead of as worker processes. Threads skip starting processes and
+    passing records between them, but only render in parallel on a
+    free-threaded (no-GIL) Python build.
+    '''
+    parser.add_argument('--threads',
+                        dest='threads',
+                        action='store_true',
+                        help=threads_help)
+
+    ndjson_help = '''
+    Stream newline-delimited JSON. Every line of the input is one resume and
+    every line of the output is a JSON object holding the record "id", taken
+    from the resume or its line number, and either its "document", its
+    "documents" by template name when several templates are given, or an
+    "error". Use "-" with -i or -o for stdin or stdout.
+    '''
+    parser.add_argument('--ndjson',
+                        dest='ndjson',
+                        action='store_true',
+                        help=ndjson_help)
+
+    styling_location_help = '''
+    The stylesheet PDF documents are laid out with. It is part of every render
+    cache key.
+    '''
+    parser.add_argument('-s',
+                        '--styling',
+                        dest='styling_location',
                         type=str,
-                        required=True,
-                        help=output_file_name_help)
+                        required=False,
+                        default='styling/pdf.css',
+                        help=styling_location_help)
+
+    pdf_help = '''
+    Lay rendered documents out as PDF in-process, using the stylesheet given
+    with -s, instead of writing markdown. The stylesheet and fonts are loaded
+    once and shared by every document in a batch.
+    '''
+    parser.add_argument('--pdf',
+                        dest='pdf',
+                        action='store_true',
+                        help=pdf_help)
+
+    render_cache_help = '''
+    A directory to cache rendered documents in. Documents are keyed on the
+    input data, the template source, the stylesheet and the source of the
+    conversion code, and are reused when none of them has changed.
+    '''
+    parser.add_argument('--render-cache',
+                        dest='render_cache_location',
+                        type=str,
+                        required=False,
+                        help=render_cache_help)
+
+    render_cache_size_help = '''
+    The maximum size of the render cache in bytes. The least recently used
+    documents are evicted beyond it. Defaults to 256 MiB.
+    '''
+    parser.add_argument('--render-cache-size',
+                        dest='render_cache_size_bytes',
+                        type=int,
+                        required=False,
+                        default=256 * 1024 * 1024,
+                        help=render_cache_size_help)
+
+    timings_help = '''
+    Record the wall time and call count of every pipeline stage, i.e., load,
+    process, render, layout and write, and of every configured parser,
+    converter and formatter, and write them to the given file as JSON. Use "-"
+    for stdout. Batch runs aggregate the timings of all records and workers.
+    '''
+    parser.add_argument('--timings',
+                        dest='timings_file_name',
+                        type=str,
+                        required=False,
+                        help=timings_help)
+
+    memoize_help = '''
+    The number of parse and format results to keep per configured parser and
+    formatter, so dates, places and numbers repeated across a batch are only
+    converted once per process. The least recently used results are evicted
+    beyond it. Use 0 to disable. Defaults to 4096. With --timings, hits and
+    misses are reported as "memoized.*.hit" and "memoized.*.miss" stages.
+    '''
+    parser.add_argument('--memoize',
+                        dest='memoization_max_size',
+                        type=int,
+                        required=False,
+                        default=4096,
+                        help=memoize_help)
+
+    validate_help = '''
+    Before rendering a batch, load every record and check the phone numbers,
+    emails and dates of the whole batch column by column. Nothing is rendered
+    if any record is invalid.
+    '''
+    parser.add_argument('--validate',
+                        dest='validate',
+                        action='store_true',
+                        help=validate_help)
 
     return parser
 
 
+def get_template_options(args: argparse.Namespace) -> TemplateOptions:
+    return TemplateOptions(args.template_location,
+                           args.bytecode_cache_location,
+                           args.template_bundle_location)
+
+
+def get_pipeline_options(args: argparse.Namespace) -> PipelineOptions:
+    render_cache_options = None
+    if args.render_cache_location is not None:
+        render_cache_options = render_cache.RenderCacheOptions(
+            args.render_cache_location, args.render_cache_size_bytes)
+
+    # "Present" is read once per run and shared by every document, including
+    # those rendered by pool workers.
+    present = datetime.now(timezone.utc)
+    return PipelineOptions(get_template_options(args),
+                           tuple(args.template_names), present,
+                           args.styling_location, render_cache_options,
+                           args.pdf, args.timings_file_name is not None,
+                           args.memoization_max_size)
+
+
+def run_single(args: argparse.Namespace,
+               timings: instrumentation.Timings) -> Tuple[int, int]:
+    pipeline = Pipeline(get_pipeline_options(args))
+    with pipeline.measure('load'):
+        data = read_in_file(args.input_file_name)
+
+    documents = pipeline.run_output(data)
+
+    with pipeline.measure('write'):
+        for (output_file_name, document) in zip(args.output_file_names,
+                                                documents.values()):
+            write_out_file(output_file_name, document)
+
+    taken = pipeline.take_timings()
+    if taken is not None:
+        timings.merge(taken)
+    return (0, 1)
+
+
+def run_batch(args: argparse.Namespace,
+              timings: instrumentation.Timings) -> Tuple[int, int]:
+    input_file_names = get_batch_input_file_names(args.batch_source)
+    if args.validate and validate_batch(input_file_names) > 0:
+        return (1, 0)
+
+    input_root = get_batch_input_root(args.batch_source)
+    file_names = [
+        (input_file_name,
+         get_batch_output_file_names(args.output_dir, input_file_name,
+                                     args.template_names,
+                                     'pdf' if args.pdf else 'md', input_root))
+        for input_file_name in input_file_names
+    ]
+
+    # Documents would silently overwrite each other, so the batch fails
+    # before any is rendered.
+    duplicates = get_duplicate_output_file_names(file_names)
+    for (output_file_name, duplicate_inputs) in sorted(duplicates.items()):
+        print(f'{output_file_name}: written by {", ".join(duplicate_inputs)}',
+              file=sys.stderr)
+    if len(duplicates) > 0:
+        return (1, 0)
+
+    output_dirs = {
+        os.path.dirname(o)
+        for (_, output_file_names) in file_names
+        for o in output_file_names
+    }
+    for d in sorted(output_dirs | {args.output_dir.strip()}):
+        os.makedirs(d, exist_ok=True)
+
+    # The pipeline is built once per worker and shared by every record that
+    # worker renders.
+    results = render_batch(get_pipeline_options(args), file_names, args.jobs,
+                           args.chunk_size, args.ordered, args.threads)
+
+    failure_count = report_batch_results(results, timings)
+    return (0 if failure_count == 0 else 1, len(file_names))
+
+
+def run_stream(args: argparse.Namespace,
+               timings: instrumentation.Timings) -> Tuple[int, int]:
+    records = 0
+    failure_count = 0
+    (output_file_name, ) = args.output_file_names
+    with open_stream(args.input_file_name, 'r') as input, \
+            open_stream(output_file_name, 'w') as output:
+        results = render_stream(get_pipeline_options(args), input, args.jobs,
+                                args.chunk_size, args.ordered, args.threads)
+        for r in results:
+            records += 1
+            if r.timings is not None:
+                timings.merge(r.timings)
+
+            output.write(r.output_line)
+            output.write('\n')
+            if r.error is not None:
+                failure_count += 1
+                print(f'{r.record_id}: {r.error}', file=sys.stderr)
+
+    return (0 if failure_count == 0 else 1, records)
+
+
 def main():
     argument_parser = get_arg_parser()
     args = argument_parser.parse_args()
 
-    template = get_template(args.template_location, args.template_name)
-    data = read_in_file(args.input_file_name)
+    is_batch = args.batch_source is not None
+    if is_batch and args.output_dir is None:
+        argument_parser.error('-b/--batch requires -d/--output-dir')
+    if not is_batch and args.output_file_names is None:
+        argument_parser.error('-i/--input requires -o/--output')
+    if is_batch and args.ndjson:
+        argument_parser.error(
+            '--ndjson streams from -i/--input, not -b/--batch')
+    if args.validate and not is_batch:
+        argument_parser.error('--validate requires -b/--batch')
+    if args.ndjson and args.pdf:
+        argument_parser.error(
+            '--pdf writes files and cannot be used with --ndjson')
+    if args.ndjson and len(args.output_file_names) != 1:
+        argument_parser.error('--ndjson requires exactly one -o/--output')
+    if not is_batch and not args.ndjson and len(args.output_file_names) != len(
+            args.template_names):
+        argument_parser.error('-o/--output must be given once per template')
+
+    run = run_batch if is_batch else run_stream if args.ndjson else run_single
 
-    proc = configure_and_get_process()
-    template_data = proc.run_with(data)
-    document = template.render(template_data)
+    timings = instrumentation.Timings()
+    start = perf_counter()
+    (exit_code, records) = run(args, timings)
+    wall_seconds = perf_counter() - start
 
-    write_out_file(args.output_file_name, document)
+    if args.timings_file_name is not None:
+        write_out_timings(args.timings_file_name, wall_seconds, records,
+                          timings)
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
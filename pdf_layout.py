@@ -0,0 +1,45 @@
+from markdown import Markdown
+from weasyprint import CSS, HTML
+from weasyprint.text.fonts import FontConfiguration
+import os
+import re
+
+# Pandoc parses markdown inside raw HTML blocks. Python-Markdown only does so
+# for elements marked with markdown="1", so the block-level tags templates
+# wrap markdown in are marked before conversion.
+_MARKDOWN_IN_HTML_BLOCK = re.compile(r'^<(div|p)\b(?![^>]*\bmarkdown=)',
+                                     re.MULTILINE)
+
+
+class PdfLayout:
+
+    def __init__(self, styling_location: str | None, base_url: str = '.'):
+        self.__base_url = os.path.abspath(base_url)
+        self.__markdown = Markdown(extensions=['md_in_html'],
+                                   output_format='html')
+
+        # Stylesheets and fonts are parsed once and shared by every document
+        # laid out with this instance.
+        self.__font_config = FontConfiguration()
+        self.__stylesheets = [] if styling_location is None else [
+            CSS(filename=styling_location.strip(),
+                font_config=self.__font_config)
+        ]
+
+    def to_html(self, document: str) -> str:
+        marked = _MARKDOWN_IN_HTML_BLOCK.sub(r'<\1 markdown="1"', document)
+        body = self.__markdown.reset().convert(marked)
+        return ('<!DOCTYPE html>\n'
+                '<html>\n<head>\n<meta charset="utf-8">\n</head>\n'
+                f'<body>\n{body}\n</body>\n</html>\n')
+
+    def write_pdf(self, document: str) -> bytes:
+        return self.write_html_pdf(self.to_html(document))
+
+    def write_html_pdf(self, html_document: str) -> bytes:
+        html = HTML(string=html_document, base_url=self.__base_url)
+        pdf = html.write_pdf(stylesheets=self.__stylesheets,
+                             font_config=self.__font_config)
+        assert pdf is not None, \
+            'WeasyPrint returns the document when no target is given'
+        return pdf
@@ -0,0 +1,122 @@
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Tuple
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+_CODE_VERSION_SOURCES = ('conversion/*.py', 'main.py',
+                         'template_projection.py', 'pdf_layout.py')
+
+
+def get_code_version() -> str:
+    # Rendered output depends on the conversion package, on how main.py
+    # configures it, on which fields template_projection.py has filled in and
+    # on how pdf_layout.py lays out PDFs, so their sources stand in for a
+    # version number.
+    root = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for pattern in _CODE_VERSION_SOURCES:
+        for file_name in sorted(glob.glob(os.path.join(root, pattern))):
+            digest.update(os.path.relpath(file_name, root).encode('utf-8'))
+            with open(file_name, 'rb') as file:
+                digest.update(file.read())
+    return digest.hexdigest()
+
+
+def get_data_hash(data: Any) -> str:
+    # Key order and whitespace in the input do not change the output, so the
+    # input is hashed in a canonical form.
+    canonical = json.dumps(data, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def get_fingerprint(*parts: str | bytes | None) -> str:
+    digest = hashlib.sha256()
+    for p in parts:
+        encoded = b'' if p is None else p if isinstance(
+            p, bytes) else p.encode('utf-8')
+        # Length-prefix each part so that ("ab", "c") and ("a", "bc") differ.
+        digest.update(len(encoded).to_bytes(8, 'big'))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class RenderCacheOptions:
+    location: str
+    max_size_bytes: int
+
+
+class RenderCache:
+
+    def __init__(self, options: RenderCacheOptions):
+        self.__location = options.location.strip()
+        self.__max_size_bytes = max(options.max_size_bytes, 0)
+
+        os.makedirs(self.__location, exist_ok=True)
+        self.__lock = threading.Lock()
+        self.__size_bytes = sum(size for (_, size, _) in self.__entries())
+
+    def get(self, key: str) -> bytes | None:
+        file_name = self.__file_name(key)
+        try:
+            with open(file_name, 'rb') as file:
+                value = file.read()
+        except FileNotFoundError:
+            return None
+
+        # Touch the entry so eviction treats it as recently used.
+        try:
+            os.utime(file_name)
+        except FileNotFoundError:
+            pass
+        return value
+
+    def put(self, key: str, value: bytes) -> None:
+        # Write to a temporary file first so concurrent readers, e.g., other
+        # pool workers, never see a partially written entry.
+        (fd, temp_file_name) = tempfile.mkstemp(dir=self.__location,
+                                                suffix='.tmp')
+        with os.fdopen(fd, 'wb') as file:
+            file.write(value)
+        os.replace(temp_file_name, self.__file_name(key))
+
+        # Threads sharing the cache share its running size, so it is only
+        # updated, and entries only evicted, by one thread at a time.
+        with self.__lock:
+            self.__size_bytes += len(value)
+            if self.__size_bytes > self.__max_size_bytes:
+                self.__evict()
+
+    def __file_name(self, key: str) -> str:
+        return os.path.join(self.__location, f'{key}.cache')
+
+    def __entries(self) -> Iterable[Tuple[str, int, float]]:
+        for entry in os.scandir(self.__location):
+            if not entry.name.endswith('.cache'):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            yield (entry.path, stat.st_size, stat.st_mtime)
+
+    def __evict(self) -> None:
+        # The running size is only an estimate when several processes share
+        # the cache, so eviction starts from a fresh scan of the directory.
+        entries: List[Tuple[str, int, float]] = sorted(self.__entries(),
+                                                       key=lambda e: e[2])
+        size_bytes = sum(size for (_, size, _) in entries)
+        for (file_name, size, _) in entries:
+            if size_bytes <= self.__max_size_bytes:
+                break
+            try:
+                os.remove(file_name)
+            except FileNotFoundError:
+                pass
+            size_bytes -= size
+
+        self.__size_bytes = size_bytes
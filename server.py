@@ -0,0 +1,277 @@
+from argparse import ArgumentParser
+from dataclasses import dataclass
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+from threading import BoundedSemaphore
+from typing import Dict
+import json
+import os
+
+import jinja2 as jinja
+
+from conversion import process
+from main import TemplateOptions, configure_and_get_process, get_template_projections, get_templates, render
+
+
+@dataclass
+class RenderServerOptions:
+    template_options: TemplateOptions
+    max_concurrent_renders: int
+    queue_timeout_seconds: float
+
+
+class Renderer:
+
+    def __init__(self, proc: process.Process, templates: Dict[str,
+                                                              jinja.Template],
+                 render_server_options: RenderServerOptions) -> None:
+        self._proc = proc
+        self._templates = templates
+        self._projections = get_template_projections(
+            render_server_options.template_options, templates.keys())
+        self._queue_timeout_seconds = render_server_options.queue_timeout_seconds
+        self._render_slots = BoundedSemaphore(
+            max(render_server_options.max_concurrent_renders, 1))
+
+    def template_names(self):
+        return sorted(self._templates.keys())
+
+    def has_template(self, name: str) -> bool:
+        return name in self._templates
+
+    def try_render(self, template_name: str, data) -> str | None:
+        acquired = self._render_slots.acquire(
+            timeout=self._queue_timeout_seconds)
+        if not acquired:
+            return None
+
+        try:
+            projection = self._projections[template_name]
+            return render(self._proc, self._templates[template_name], data,
+                          projection.section_limits, projection.field_mask)
+        finally:
+            self._render_slots.release()
+
+
+def create_request_handler(renderer: Renderer):
+
+    class RenderRequestHandler(BaseHTTPRequestHandler):
+
+        # HTTP/1.1 keeps connections open, so clients can pipeline requests:
+        # they are read off the connection and answered in order.
+        protocol_version = 'HTTP/1.1'
+
+        def address_string(self) -> str:
+            # Unix domain socket clients have no address.
+            return self.client_address[0] if isinstance(
+                self.client_address, tuple) else 'unix'
+
+        def do_GET(self) -> None:
+            if self.path.rstrip('/') != '/templates':
+                self._send(HTTPStatus.NOT_FOUND, 'Unknown path\n')
+                return
+
+            self._send(HTTPStatus.OK, json.dumps(renderer.template_names()),
+                       'application/json')
+
+        def do_POST(self) -> None:
+            prefix = '/render/'
+            if not self.path.startswith(prefix):
+                self._send(HTTPStatus.NOT_FOUND, 'Unknown path\n')
+                return
+
+            template_name = self.path[len(prefix):].strip('/')
+            try:
+                content_length = int(self.headers.get('Content-Length', 0))
+            except ValueError:
+                content_length = -1
+            if content_length < 0:
+                # Without a length the body cannot be told apart from the
+                # next request, so the connection is closed.
+                self._send(HTTPStatus.BAD_REQUEST,
+                           'Invalid Content-Length header\n')
+                self.close_connection = True
+                return
+            body = self.rfile.read(content_length)
+
+            if not renderer.has_template(template_name):
+                self._send(HTTPStatus.NOT_FOUND,
+                           f'Unknown template: {template_name}\n')
+                return
+
+            try:
+                data = json.loads(body)
+                document = renderer.try_render(template_name, data)
+            except Exception as e:
+                self._send(HTTPStatus.BAD_REQUEST,
+                           f'{type(e).__name__}: {e}\n')
+                return
+
+            if document is None:
+                self._send(HTTPStatus.SERVICE_UNAVAILABLE,
+                           'Too many concurrent renders\n')
+                return
+
+            self._send(HTTPStatus.OK, document, 'text/markdown')
+
+        def _send(self,
+                  status: HTTPStatus,
+                  text: str,
+                  content_type: str = 'text/plain') -> None:
+            encoded = text.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+            self.send_header('Content-Length', str(len(encoded)))
+            self.end_headers()
+            self.wfile.write(encoded)
+
+    return RenderRequestHandler
+
+
+class ThreadingUnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+
+    daemon_threads = True
+
+
+def get_arg_parser() -> ArgumentParser:
+    prog = "Resume Generator Render Server"
+    description = '''
+    A long-running server that keeps the configured process and the compiled
+    templates in memory and renders resumes on request. POST resume JSON to
+    /render/TEMPLATE_NAME to receive the rendered document.
+    '''
+    parser = ArgumentParser(prog=prog, description=description)
+
+    template_location_help = '''
+    The directory containing template files. Every template in it is compiled
+    once at startup.
+    '''
+    parser.add_argument('-t',
+                        '--template',
+                        dest='template_location',
+                        type=str,
+                        required=False,
+                        default='templates',
+                        help=template_location_help)
+
+    bytecode_cache_help = '''
+    A directory to cache compiled template bytecode in.
+    '''
+    parser.add_argument('--bytecode-cache',
+                        dest='bytecode_cache_location',
+                        type=str,
+                        required=False,
+                        help=bytecode_cache_help)
+
+    template_bundle_help = '''
+    A directory or zip file of precompiled templates to load templates from.
+    '''
+    parser.add_argument('--template-bundle',
+                        dest='template_bundle_location',
+                        type=str,
+                        required=False,
+                        help=template_bundle_help)
+
+    host_help = '''
+    The host to listen on.
+    '''
+    parser.add_argument('--host',
+                        dest='host',
+                        type=str,
+                        required=False,
+                        default='127.0.0.1',
+                        help=host_help)
+
+    port_help = '''
+    The port to listen on.
+    '''
+    parser.add_argument('-p',
+                        '--port',
+                        dest='port',
+                        type=int,
+                        required=False,
+                        default=8082,
+                        help=port_help)
+
+    unix_socket_help = '''
+    Listen on the Unix domain socket at the given path instead of a TCP port.
+    '''
+    parser.add_argument('-u',
+                        '--unix-socket',
+                        dest='unix_socket',
+                        type=str,
+                        required=False,
+                        help=unix_socket_help)
+
+    max_concurrent_renders_help = '''
+    The maximum number of renders that run at once. Requests beyond the limit
+    wait for a free slot.
+    '''
+    parser.add_argument('-c',
+                        '--max-concurrent-renders',
+                        dest='max_concurrent_renders',
+                        type=int,
+                        required=False,
+                        default=4,
+                        help=max_concurrent_renders_help)
+
+    queue_timeout_help = '''
+    The number of seconds a request waits for a free render slot before it is
+    rejected with 503 Service Unavailable.
+    '''
+    parser.add_argument('--queue-timeout',
+                        dest='queue_timeout_seconds',
+                        type=float,
+                        required=False,
+                        default=30.0,
+                        help=queue_timeout_help)
+
+    memoize_help = '''
+    The number of parse and format results to keep per configured parser and
+    formatter across requests. The least recently used results are evicted
+    beyond it. Use 0 to disable.
+    '''
+    parser.add_argument('--memoize',
+                        dest='memoization_max_size',
+                        type=int,
+                        required=False,
+                        default=4096,
+                        help=memoize_help)
+
+    return parser
+
+
+def main() -> None:
+    parser = get_arg_parser()
+    args = parser.parse_args()
+
+    template_options = TemplateOptions(args.template_location,
+                                       args.bytecode_cache_location,
+                                       args.template_bundle_location)
+    render_server_options = RenderServerOptions(template_options,
+                                                args.max_concurrent_renders,
+                                                args.queue_timeout_seconds)
+    proc = configure_and_get_process(
+        memoization_max_size=args.memoization_max_size)
+    renderer = Renderer(proc,
+                        get_templates(render_server_options.template_options),
+                        render_server_options)
+    handler = create_request_handler(renderer)
+
+    if args.unix_socket is not None:
+        if os.path.exists(args.unix_socket):
+            os.remove(args.unix_socket)
+        server = ThreadingUnixHTTPServer(args.unix_socket, handler)
+    else:
+        server = ThreadingHTTPServer((args.host, args.port), handler)
+
+    with server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+from conversion import process
+from dataclasses import asdict, dataclass
+from jinja2 import meta, nodes
+from typing import Dict, FrozenSet, List, Set, Tuple
+import jinja2 as jinja
+
+_ROOT_NAMES = ('profile', 'work_experience', 'education',
+               'technical_knowledge', 'projects')
+
+# Nodes that pull in other templates or bind names in ways a single pass
+# cannot follow. Templates using them read everything.
+_OPAQUE_NODES = (nodes.Include, nodes.Extends, nodes.Import, nodes.FromImport,
+                 nodes.Macro, nodes.CallBlock)
+
+Path = Tuple[str, ...]
+# A name is bound to the template data it reads, or, for a loop variable
+# iterating over range(n), to n.
+Scope = Dict[str, Path | int]
+
+# The lists section limits apply to, by section limit.
+_LIMITED_LISTS: Dict[str, Path] = {
+    'work_experience': ('work_experience', ),
+    'contributions': ('work_experience', '*', 'contributions'),
+    'education': ('education', ),
+    'notable_coursework': ('education', '*', 'notable_coursework'),
+    'involvement': ('education', '*', 'involvement'),
+    'involvement_levels': ('education', '*', 'involvement', '*', 'levels'),
+    'technical_knowledge': ('technical_knowledge', ),
+    'proficiencies': ('technical_knowledge', '*', 'proficiencies'),
+    'projects': ('projects', )
+}
+
+# Loop attributes that do not depend on the items after the current one.
+_FORWARD_LOOP_ATTRIBUTES = ('index', 'index0', 'first', 'cycle', 'depth',
+                            'depth0', 'previtem', 'changed')
+
+
+class OpaqueTemplateException(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class TemplateProjection:
+    field_mask: process.FieldMask = process.FieldMask()
+    section_limits: process.SectionLimits = process.SectionLimits()
+
+
+class FieldReadCollector:
+
+    def __init__(self):
+        # Paths read whole, and, for lists read item by item, how many items
+        # each read shows. None shows every item.
+        self.__paths: Set[Path] = set()
+        self.__item_reads: Dict[Path, List[int | None]] = {}
+
+    def collect(self, template: nodes.Template) -> Set[Path]:
+        scope: Scope = {n: (n, ) for n in _ROOT_NAMES}
+        self.__visit_all(template.body, scope)
+        return self.__paths
+
+    def get_section_limits(self) -> process.SectionLimits:
+        # A list needs no more items than the most any read of it shows. A
+        # list read whole, or below something read whole, needs them all.
+        limits = {}
+        for (name, path) in _LIMITED_LISTS.items():
+            counts = self.__item_reads.get(path, [None])
+            read_whole = any(path[0:len(p)] == p for p in self.__paths)
+            limits[name] = None if read_whole or None in counts else max(
+                counts)
+        return process.SectionLimits(**limits)
+
+    def __visit_all(self, items, scope: Scope) -> None:
+        for n in items:
+            self.__visit(n, scope)
+
+    def __visit(self, node: nodes.Node, scope: Scope) -> None:
+        if isinstance(node, _OPAQUE_NODES):
+            raise OpaqueTemplateException(type(node).__name__)
+
+        if self.__visit_whole_read(node, scope):
+            return
+
+        path = self.__get_path(node, scope)
+        if path is not None:
+            self.__paths.add(path)
+            return
+
+        match node:
+            case nodes.For():
+                self.__visit_for(node, scope)
+            case nodes.Assign(target=nodes.Name() as target):
+                self.__visit(node.node, scope)
+                self.__bind(target.name, node.node, scope)
+            case nodes.With():
+                inner = dict(scope)
+                for (target, value) in zip(node.targets, node.values):
+                    self.__visit(value, scope)
+                    if isinstance(target, nodes.Name):
+                        self.__bind(target.name, value, inner)
+                self.__visit_all(node.body, inner)
+            case _:
+                self.__visit_all(node.iter_child_nodes(), scope)
+
+    def __visit_for(self, node: nodes.For, scope: Scope) -> None:
+        if node.recursive:
+            raise OpaqueTemplateException('recursive For')
+
+        # Iterating over a list only reads its items, which the loop body
+        # reads through the loop variable.
+        (iterated, count) = self.__get_iterated(node, scope)
+        if iterated is None:
+            self.__visit(node.iter, scope)
+
+        inner = dict(scope)
+        if isinstance(node.target, nodes.Name):
+            if iterated is None:
+                inner.pop(node.target.name, None)
+                stop = get_range_stop(node.iter)
+                if stop is not None:
+                    inner[node.target.name] = stop
+            else:
+                inner[node.target.name] = iterated + ('*', )
+                self.__read_items(iterated, count)
+        else:
+            for n in node.target.find_all(nodes.Name):
+                inner.pop(n.name, None)
+            if iterated is not None:
+                self.__paths.add(iterated)
+
+        if node.test is not None:
+            self.__visit(node.test, inner)
+        self.__visit_all(node.body, inner)
+        self.__visit_all(node.else_, scope)
+
+    def __get_iterated(self, node: nodes.For,
+                       scope: Scope) -> Tuple[Path | None, int | None]:
+        # The list a loop iterates over and how many of its items the loop
+        # shows, e.g., three for "items[:3]", or for a body of nothing but
+        # "if loop.index <= 3".
+        count = get_loop_index_bound(node)
+        sliced = get_slice_stop(node.iter)
+        if sliced is None:
+            return (self.__get_path(node.iter, scope), count)
+
+        assert isinstance(node.iter, nodes.Getitem)
+        iterated = self.__get_path(node.iter.node, scope)
+        return (iterated, sliced if count is None else min(count, sliced))
+
+    def __read_items(self, path: Path, count: int | None) -> None:
+        self.__item_reads.setdefault(path, []).append(count)
+
+    def __visit_whole_read(self, node: nodes.Node, scope: Scope) -> bool:
+        # Calling a method of template data, e.g., profile.get(k) or
+        # profile.items(), or reading it with a key other than a field name or
+        # an index, e.g., item[k], may read any field below it, so its whole
+        # subtree is read, and the arguments themselves may read template
+        # data. Whatever is read from the result is already covered.
+        match node:
+            case nodes.Call(node=nodes.Getattr() as method):
+                parent = self.__get_path(method.node, scope)
+                if parent is None:
+                    return False
+                self.__paths.add(parent)
+                self.__visit_all(node.args, scope)
+                self.__visit_all(node.kwargs, scope)
+                for n in (node.dyn_args, node.dyn_kwargs):
+                    if n is not None:
+                        self.__visit(n, scope)
+                return True
+            case nodes.Getitem() if not is_field_key(node.arg, scope):
+                parent = self.__get_path(node.node, scope)
+                if parent is None:
+                    return False
+                self.__paths.add(parent)
+                self.__visit(node.arg, scope)
+                return True
+            case _:
+                return False
+
+    def __bind(self, name: str, value: nodes.Node, scope: Scope) -> None:
+        path = self.__get_path(value, scope)
+        if path is None:
+            scope.pop(name, None)
+        else:
+            scope[name] = path
+
+    def __get_path(self, node: nodes.Node, scope: Scope) -> Path | None:
+        match node:
+            case nodes.Name(ctx='load') if isinstance(scope.get(node.name),
+                                                      tuple):
+                return scope[node.name]
+            case nodes.Getattr():
+                parent = self.__get_path(node.node, scope)
+                return None if parent is None else parent + (node.attr, )
+            case nodes.Getitem() if is_field_key(node.arg, scope):
+                parent = self.__get_path(node.node, scope)
+                if parent is None:
+                    return None
+
+                # Constant string keys name a field. Constant indexes and
+                # range(n) loop variables read some of a list's items.
+                if isinstance(node.arg, nodes.Const) and isinstance(
+                        node.arg.value, str):
+                    return parent + (node.arg.value, )
+                self.__read_items(parent, get_index_count(node.arg, scope))
+                return parent + ('*', )
+            case _:
+                # Anything else, e.g., a method call or a read through a
+                # variable key, is not a single path, and is recorded whole by
+                # __visit_whole_read.
+                return None
+
+
+def get_constant_int(node: nodes.Node) -> int | None:
+    if isinstance(node, nodes.Const) and type(node.value) is int:
+        return node.value
+    return None
+
+
+def is_field_key(key: nodes.Node, scope: Scope) -> bool:
+    # Whether reading with the key narrows a read to one field, or to some of
+    # a list's items.
+    if isinstance(key, nodes.Const) and isinstance(key.value, str):
+        return True
+    return get_index_count(key, scope) is not None
+
+
+def get_range_stop(node: nodes.Node) -> int | None:
+    # range(n) and range(start, n), for constant n.
+    match node:
+        case nodes.Call(node=nodes.Name(name='range'),
+                        args=[_] | [_, _],
+                        kwargs=[],
+                        dyn_args=None,
+                        dyn_kwargs=None):
+            return get_constant_int(node.args[-1])
+        case _:
+            return None
+
+
+def get_slice_stop(node: nodes.Node) -> int | None:
+    # items[:n] and items[0:n], for constant n.
+    match node:
+        case nodes.Getitem(arg=nodes.Slice(
+            step=None) as key) if (key.start is None
+                                   or get_constant_int(key.start) == 0):
+            stop = None if key.stop is None else get_constant_int(key.stop)
+            return None if stop is None or stop < 0 else stop
+        case _:
+            return None
+
+
+def get_index_count(key: nodes.Node, scope: Scope) -> int | None:
+    # How many items of a list indexing it with the key may read.
+    index = get_constant_int(key)
+    if index is not None:
+        return index + 1 if index >= 0 else None
+    match key:
+        case nodes.Name(ctx='load') if isinstance(scope.get(key.name), int):
+            return max(scope[key.name], 0)
+        case _:
+            return None
+
+
+def get_loop_index_bound(node: nodes.For) -> int | None:
+    # A loop whose body is nothing but "if loop.index <= n" shows only the
+    # first n items, unless the items are filtered or the body asks for what
+    # comes after the current item, e.g., loop.last.
+    if node.test is not None or len(node.body) != 1:
+        return None
+
+    guard = node.body[0]
+    match guard:
+        case nodes.If(test=nodes.Compare(
+            expr=nodes.Getattr(node=nodes.Name(name='loop'),
+                               attr=('index' | 'index0') as attr),
+            ops=[nodes.Operand(op=('lt' | 'lteq') as op, expr=bound)]),
+                      elif_=[],
+                      else_=[]):
+            n = get_constant_int(bound)
+        case _:
+            return None
+
+    loop_names = sum(1 for n in guard.find_all(nodes.Name) if n.name == 'loop')
+    forward_reads = sum(
+        1 for g in guard.find_all(nodes.Getattr)
+        if isinstance(g.node, nodes.Name) and g.node.name == 'loop'
+        and g.attr in _FORWARD_LOOP_ATTRIBUTES)
+    if n is None or loop_names != forward_reads:
+        return None
+
+    # loop.index counts from one and loop.index0 from zero. At least one item
+    # is kept, so the loop's else branch runs exactly when it did before.
+    count = n + (1 if op == 'lteq' else 0) - (1 if attr == 'index' else 0)
+    return max(count, 1)
+
+
+def get_projection(env: jinja.Environment, source: str) -> TemplateProjection:
+    # Only the fields a template reads need to be converted and formatted,
+    # and only the items it shows sorted and formatted. When a template's
+    # reads cannot be followed, it gets every field and every item.
+    collector = FieldReadCollector()
+    try:
+        paths = collector.collect(env.parse(source))
+    except OpaqueTemplateException:
+        return TemplateProjection()
+
+    return TemplateProjection(process.FieldMask(frozenset(paths)),
+                              collector.get_section_limits())
+
+
+def get_block_sections(env: jinja.Environment,
+                       source: str) -> Dict[str, FrozenSet[str]]:
+    # Top-level blocks reading nothing but template data sections and
+    # environment globals render the same while those sections are unchanged,
+    # so each maps to the sections it reads. Blocks reading anything else,
+    # e.g., names set outside of them, rendering other blocks through self or
+    # super(), or pulling in other templates are left out.
+    known_names = set(_ROOT_NAMES) | set(env.globals.keys())
+    block_sections = {}
+    for block in env.parse(source).body:
+        if not isinstance(
+                block, nodes.Block) or block.find(_OPAQUE_NODES) is not None:
+            continue
+        if any(n.name in ('self', 'super')
+               for n in block.find_all(nodes.Name)):
+            continue
+
+        body = nodes.Template(block.body)
+        body.set_environment(env)
+        names = meta.find_undeclared_variables(body)
+        if names <= known_names:
+            block_sections[block.name] = frozenset(names & set(_ROOT_NAMES))
+    return block_sections
+
+
+def to_json(mask: process.FieldMask) -> list:
+    return sorted(list(p) for p in mask.paths)
+
+
+def from_json(paths: list) -> process.FieldMask:
+    return process.FieldMask(frozenset(tuple(p) for p in paths))
+
+
+def section_limits_to_json(limits: process.SectionLimits) -> dict:
+    return asdict(limits)
+
+
+def section_limits_from_json(limits: dict) -> process.SectionLimits:
+    return process.SectionLimits(**limits)
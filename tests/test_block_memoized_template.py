@@ -0,0 +1,56 @@
+from main import BlockMemoizedTemplate
+import jinja2 as jinja
+import template_projection
+import unittest
+
+_SELF_SOURCE = '''
+{%- block profile %}{{ profile }}{% endblock %}|
+{%- block summary %}{{ self.profile() }}{{ projects|length }}{% endblock %}'''
+
+
+def get_block_memoized_template(source: str) -> BlockMemoizedTemplate:
+    env = jinja.Environment()
+    return BlockMemoizedTemplate(
+        env.from_string(source),
+        template_projection.get_block_sections(env, source), 8)
+
+
+class SelfReferenceTest(unittest.TestCase):
+
+    def test_a_block_rendering_another_block_is_not_memoized(self):
+        sections = template_projection.get_block_sections(
+            jinja.Environment(), _SELF_SOURCE)
+
+        self.assertEqual(set(sections), {'profile'})
+
+    def test_a_block_rendering_another_block_sees_its_changes(self):
+        template = get_block_memoized_template(_SELF_SOURCE)
+
+        self.assertEqual(template.render({
+            'profile': 'A',
+            'projects': []
+        }), 'A|A0')
+        self.assertEqual(template.render({
+            'profile': 'B',
+            'projects': []
+        }), 'B|B0')
+
+
+class CacheStatsTest(unittest.TestCase):
+
+    def test_reused_blocks_count_as_hits(self):
+        template = get_block_memoized_template(
+            '{% block profile %}{{ profile }}{% endblock %}')
+        profile = 'A'
+
+        template.render({'profile': profile})
+        template.render({'profile': profile})
+        template.render({'profile': 'B'})
+        template.render({'profile': 'A'})
+        stats = template.cache_stats()
+
+        self.assertEqual((stats['hits'], stats['misses']), (2, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
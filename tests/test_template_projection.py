@@ -0,0 +1,125 @@
+from main import configure_and_get_process
+import jinja2 as jinja
+import template_projection
+import unittest
+
+_VARIABLE_KEY_SOURCE = '''
+{%- for we in work_experience %}{% for k in ['title', 'location'] %}
+{{ we[k] }}{% endfor %}{% endfor %}'''
+
+_DATA = {
+    'profile': {
+        'name': 'Jane Q. Developer',
+        'phoneNumber': '+1 (555) 123-4567',
+        'email': 'jane@example.com'
+    },
+    'workExperience': [{
+        'companyName': 'Acme',
+        'location': {
+            'city': 'Austin',
+            'state': 'TX'
+        },
+        'title': 'Engineer',
+        'startDate': '2021-06',
+        'endDate': '2022-06',
+        'contributions': [{
+            'rank': 1,
+            'text': 'Built a'
+        }]
+    }]
+}
+
+
+class VariableKeyTest(unittest.TestCase):
+
+    def test_reading_a_variable_key_keeps_every_field(self):
+        env = jinja.Environment()
+        mask = template_projection.get_projection(
+            env, _VARIABLE_KEY_SOURCE).field_mask
+
+        self.assertTrue(mask.has('work_experience', '*', 'title'))
+        self.assertTrue(mask.has('work_experience', '*', 'location'))
+
+    def test_rendering_with_the_mask_keeps_every_field(self):
+        env = jinja.Environment()
+        mask = template_projection.get_projection(
+            env, _VARIABLE_KEY_SOURCE).field_mask
+        template = env.from_string(_VARIABLE_KEY_SOURCE)
+        template_data = configure_and_get_process().run_with(_DATA, mask=mask)
+
+        self.assertEqual(template.render(template_data),
+                         '\nEngineer\nAustin, TX')
+
+
+class MethodCallTest(unittest.TestCase):
+
+    def test_calling_get_keeps_every_field(self):
+        mask = template_projection.get_projection(
+            jinja.Environment(),
+            "{{ profile.get('phone_number') }}").field_mask
+
+        self.assertTrue(mask.has('profile', 'phone_number'))
+
+    def test_calling_items_keeps_every_field(self):
+        mask = template_projection.get_projection(
+            jinja.Environment(), '''
+            {%- for (k, v) in profile.items() %}{{ v }}{% endfor %}'''
+        ).field_mask
+
+        self.assertTrue(mask.has('profile', 'phone_number'))
+        self.assertTrue(mask.has('profile', 'email'))
+
+    def test_rendering_with_the_mask_of_get_keeps_the_field(self):
+        env = jinja.Environment()
+        template = env.from_string("{{ profile.get('phone_number') }}")
+        mask = template_projection.get_projection(
+            env, "{{ profile.get('phone_number') }}").field_mask
+        template_data = configure_and_get_process().run_with(_DATA, mask=mask)
+
+        self.assertEqual(template.render(template_data), '555.123.4567')
+
+
+class VariableIndexTest(unittest.TestCase):
+
+    def test_an_attribute_after_a_variable_index_keeps_every_item(self):
+        mask = template_projection.get_projection(
+            jinja.Environment(), '''
+            {%- set first = 0 %}{{ work_experience[first].location }}'''
+        ).field_mask
+
+        self.assertTrue(mask.has('work_experience', '*', 'location'))
+
+    def test_a_list_after_a_variable_index_is_not_limited(self):
+        projection = template_projection.get_projection(
+            jinja.Environment(), '''
+            {%- set first = 0 %}
+            {{- work_experience[first].contributions[0] }}''')
+
+        self.assertTrue(
+            projection.field_mask.has('work_experience', '*', 'contributions',
+                                      '*'))
+        self.assertIsNone(projection.section_limits.contributions)
+
+
+class SectionLimitsTest(unittest.TestCase):
+
+    def test_indexing_with_a_range_loop_variable_limits_the_list(self):
+        limits = template_projection.get_projection(
+            jinja.Environment(), '''
+            {%- for we in work_experience %}{% for i in range(3) %}
+            {{ we.contributions[i] }}{% endfor %}{% endfor %}'''
+        ).section_limits
+
+        self.assertEqual(limits.contributions, 3)
+
+    def test_iterating_over_every_item_does_not_limit_the_list(self):
+        limits = template_projection.get_projection(
+            jinja.Environment(), '''
+            {%- for we in work_experience %}{% for c in we.contributions %}
+            {{ c }}{% endfor %}{% endfor %}''').section_limits
+
+        self.assertIsNone(limits.contributions)
+
+
+if __name__ == '__main__':
+    unittest.main()